@@ -11,22 +11,25 @@ Usage:
         - Saves VM list to ./crusoe/icat-vms.json for review
         - Run this FIRST to generate the VM list
 
-    python crusoe_shared_disks_migrate.py unmount [-y]
+    python crusoe_shared_disks_migrate.py unmount [-y] [--only-unreachable]
         - Connects to each VM in icat-vms.json via SSH
         - Records current NFS mounts on each VM to ./crusoe/mounts.json
         - Unmounts all NFS mounts on all VMs
+        - Mounts saved by an earlier run are kept, so it can be run again safely
+        - With --only-unreachable, only the VMs that were unreachable in an earlier run are processed
 
-    python crusoe_shared_disks_migrate.py remount [-y]
+    python crusoe_shared_disks_migrate.py remount [-y] [--mount-options <options>]
         - Remounts volumes recorded by 'unmount' using DNS on all VMs
 
-    python crusoe_shared_disks_migrate.py fstab [-y]
+    python crusoe_shared_disks_migrate.py fstab [-y] [--mount-options <options>]
         - Updates /etc/fstab to use DNS instead of IP-based mounts on all VMs
+        - Keeps the previous file as /etc/fstab.bak on each VM
 
     python crusoe_shared_disks_migrate.py rollback [-y]
         - Rolls back to IP-based mounts using saved mount info on all VMs
 
-    python crusoe_shared_disks_migrate.py verify-mounts
-        - Verifies NFS mounts on all VMs in icat-vms.json
+    python crusoe_shared_disks_migrate.py verify-mounts [--parallel <N>]
+        - Verifies NFS mounts on all VMs in icat-vms.json, N VMs at a time (default 20)
         - Tests read and write access to each mount point
         - Outputs results to nfs_mounts.txt
 
@@ -35,54 +38,237 @@ NFS Mount Options:
         mount -t nfs <IP>:/volumes/<volume_id> /mount/point
 
     DNS-based mount (new):
-        mount -o vers=3,nconnect=16,spread_reads,spread_writes,remoteports=dns,_netdev,nofail,x-systemd.automount,x-systemd.idle-timeout=30 \\
+        mount -o vers=3,nconnect=16,spread_reads,spread_writes,remoteports=dns,rsize=1048576,wsize=1048576,_netdev,nofail,x-systemd.automount,x-systemd.idle-timeout=30 \\
             nfs.crusoecloudcompute.com:/volumes/<volume_id> /mount/point
 
     Key differences:
         - DNS-based mounts use nfs.crusoecloudcompute.com instead of a specific IP
         - remoteports=dns enables DNS-based endpoint resolution for better load balancing
+        - rsize/wsize=1048576 request 1MB transfers, so large I/O takes fewer round-trips
         - _netdev tells the system to delay the mount attempt until the network is fully up
         - x-systemd.automount and x-systemd.idle-timeout=30 enable automatic mount/unmount via systemd
         - nofail prevents the VM from dropping into emergency mode if the mount fails
 
     Example fstab entry (DNS-based):
-        nfs.crusoecloudcompute.com:/volumes/<volume_id> /mount/point nfs vers=3,nconnect=16,spread_reads,spread_writes,remoteports=dns,_netdev,nofail,x-systemd.automount,x-systemd.idle-timeout=30 0 0
+        nfs.crusoecloudcompute.com:/volumes/<volume_id> /mount/point nfs vers=3,nconnect=16,spread_reads,spread_writes,remoteports=dns,rsize=1048576,wsize=1048576,_netdev,nofail,x-systemd.automount,x-systemd.idle-timeout=30 0 0
+
+    Additional options can be appended with --mount-options on 'remount' and 'fstab'. For
+    volumes that are not written concurrently from several VMs, relaxing attribute caching
+    (e.g. actimeo=600,nocto,lookupcache=pos) cuts metadata round-trips for small-file workloads.
 
 If you have any questions, don't hesitate to reach out to Crusoe support.
 """
 
-import argparse
-import base64
 import shlex
 import subprocess
 import sys
 import json
+import threading
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import orjson  # optional, faster JSON encoding and decoding for large mount sets and VM lists
+except ImportError:
+    orjson = None
 
 # START statics
 CRUSOE_NFS_DOMAIN = "nfs.crusoecloudcompute.com"
+NFS_PORT = 2049
+NFS_NCONNECT = 16  # TCP connections per mount; lower this when very many clients share a server
+# 1MB rsize/wsize is negotiated down by the server if it supports less
+DNS_MOUNT_OPTIONS = (
+    f"vers=3,nconnect={NFS_NCONNECT},spread_reads,spread_writes,remoteports=dns,rsize=1048576,wsize=1048576"
+)
+DNS_FSTAB_OPTIONS = "_netdev,nofail,x-systemd.automount,x-systemd.idle-timeout=30"
 CRUSOE_DIR = "./crusoe"
 MOUNTS_FILE = os.path.join(CRUSOE_DIR, "mounts.json")
 ICAT_VMS_FILE = os.path.join(CRUSOE_DIR, "icat-vms.json")
 VERIFY_OUTPUT_FILE = "nfs_mounts.txt"
 TARGET_LOCATION = "eu-iceland1-a"
 NFS_TEST_TIMEOUT = 5  # Timeout in seconds for read/write tests
+# Run on a VM to check the NFS domain resolves there and accepts TCP connections on the NFS port;
+# ICMP may be blocked while NFS works, so probe the port the mount will actually use
+NFS_PROBE_ARGV = ["timeout", "3", "bash", "-c", f"</dev/tcp/{CRUSOE_NFS_DOMAIN}/{NFS_PORT}"]
+VM_LIST_STREAM_MIN_BYTES = 64 * 1024  # Larger VM lists are parsed incrementally if ijson is installed
+PRETTY_JSON_MAX_ITEMS = 500  # Longer lists are written one compact entry per line instead of fully indented
+MAX_COMMANDS_PER_VM = 8  # mount/umount commands a batch runs at once on a VM
+MAX_PARALLEL_VMS = 20  # VMs worked on at once, each with a single ssh command in flight
+PRECHECK_MAX_WORKERS = 32  # VMs whose ssh connection is opened at once by precheck_vms
+PRECHECK_CONNECT_TIMEOUT = 3  # Seconds a VM gets to accept the precheck's TCP connection
+PRECHECK_TIMEOUT = 10  # Seconds a VM gets to complete the precheck's ssh handshake and auth
+# GSSAPI auth is never used for these VMs and can stall each handshake on Kerberos lookups;
+# keepalives let a dead VM's shared connection be noticed instead of hanging until the timeout
+SSH_OPTIONS = [
+    "-o", "StrictHostKeyChecking=no", "-o", "ConnectTimeout=10",
+    "-o", "GSSAPIAuthentication=no", "-o", "ServerAliveInterval=60"
+]
+# Every ssh command to a VM shares one connection, kept open for 10 minutes after the last use
+SSH_CONTROL_OPTIONS = [
+    "-o", "ControlMaster=auto", "-o", "ControlPath=~/.ssh/cm-%r@%h:%p", "-o", "ControlPersist=600"
+]
 # END statics
 
+# Shell function used by run_remote_batch: runs one command, killing it after $t seconds, and reports
+# "<index> OK" or "<index> FAIL <error>" on a single line, returning 1 on failure
+BATCH_RUN_FUNCTION = """run() {
+  i=$1; shift
+  if out=$(timeout -k 5 "$t" "$@" 2>&1); then
+    echo "$i OK"
+  else
+    rc=$?
+    if [ "$rc" -eq 124 ]; then
+      echo "$i FAIL Command timed out after $t seconds"
+    else
+      printf '%s FAIL Command failed (exit %s): %s\\n' "$i" "$rc" "$(printf '%s' "$out" | tr '\\n' ' ')"
+    fi
+    return 1
+  fi
+}
+"""
 
-def run_command(command, timeout=5):
-    """Execute a shell command and return (stdout, error)."""
+# Run by python3 on a VM by verify-mounts, with the per-test timeout as its argument. Tests every
+# NFS mount in-process and concurrently, printing "count|read_ok|write_ok|mount(RW),..." like the
+# bash fallback. Hung mounts can't be interrupted by signals, so each mount gets a thread and
+# whatever hasn't finished by the deadline is reported as failed.
+VERIFY_PYTHON_SCRIPT = r"""
+import os, re, sys, threading, time
+
+timeout = float(sys.argv[1])
+mounts = []
+with open("/proc/self/mountinfo") as f:
+    for line in f:
+        fields, _, fs_fields = line.partition(" - ")
+        if fs_fields.split(" ", 1)[0] == "nfs":
+            mounts.append(re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), fields.split(" ")[4]))
+if not mounts:
+    print("0|0|0|none")
+    sys.exit(0)
+
+results = [["-", "-"] for _ in mounts]
+
+def test(i, mount):
+    try:
+        os.listdir(mount)
+        results[i][0] = "R"
+    except OSError:
+        pass
+    path = os.path.join(mount, ".tmp_crusoe_nfs_verify_test_%d" % os.getpid())
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+    except OSError:
+        return  # nothing was created, so nothing to clean up
+    try:
+        os.close(fd)
+        os.unlink(path)
+        results[i][1] = "W"
+    except OSError:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+threads = [threading.Thread(target=test, args=(i, m), daemon=True) for i, m in enumerate(mounts)]
+for t in threads:
+    t.start()
+deadline = time.monotonic() + 2 * timeout
+for t in threads:
+    t.join(max(0, deadline - time.monotonic()))
+
+status = [r + w for r, w in (list(r) for r in results)]
+print("%d|%d|%d|%s" % (
+    len(mounts), sum(s[0] == "R" for s in status), sum(s[1] == "W" for s in status),
+    ",".join("%s(%s)" % (m, s) for m, s in zip(mounts, status))
+))
+sys.stdout.flush()
+# Don't wait on threads stuck in a hung mount
+os._exit(0)
+"""
+
+# Run on each VM by verify-mounts as a single ssh command, so one connection does all the testing.
+# python3 tests all mounts in one process; the bash loop is kept for VMs without it.
+# Built once here, since it only depends on the statics above
+VERIFY_SCRIPT = f'''
+if command -v python3 >/dev/null 2>&1; then
+python3 - {NFS_TEST_TIMEOUT} <<'PY'
+{VERIFY_PYTHON_SCRIPT}PY
+exit 0
+fi
+
+mounts=$(findmnt -t nfs -n -o TARGET 2>/dev/null)
+if [ -z "$mounts" ]; then
+    echo "0|0|0|none"
+    exit 0
+fi
+
+count=0
+read_ok=0
+write_ok=0
+mount_status=""
+
+while IFS= read -r mount; do
+    [ -z "$mount" ] && continue
+    count=$((count + 1))
+
+    # Read test: try to list the directory (with timeout for hung NFS)
+    if timeout {NFS_TEST_TIMEOUT} ls "$mount" >/dev/null 2>&1; then
+        r="R"
+        read_ok=$((read_ok + 1))
+    else
+        r="-"
+    fi
+
+    # Write test: try to create and remove a temp file (with timeout for hung NFS)
+    testfile="$mount/.tmp_crusoe_nfs_verify_test_$$"
+    if timeout {NFS_TEST_TIMEOUT} touch "$testfile" 2>/dev/null && timeout {NFS_TEST_TIMEOUT} rm -f "$testfile" 2>/dev/null; then
+        w="W"
+        write_ok=$((write_ok + 1))
+    else
+        # Don't leave the test file behind, unless touch or rm timed out: another rm would just hang too
+        [ $? -ne 124 ] && timeout {NFS_TEST_TIMEOUT} rm -f "$testfile" 2>/dev/null
+        w="-"
+    fi
+
+    mount_status="${{mount_status}}${{mount}}(${{r}}${{w}}),"
+done <<< "$mounts"
+
+mount_status=${{mount_status%,}}
+echo "${{count}}|${{read_ok}}|${{write_ok}}|${{mount_status}}"
+'''
+
+# Matches a Crusoe NFS fstab entry: <host>:/volumes/<volume_id> <mount_point> nfs <options> ...
+FSTAB_NFS_RE = re.compile(r"^\s*([^#\s]\S*):/volumes/(\S+)\s+(\S+)\s+nfs\s+\S+")
+
+# Octal escapes used for whitespace and backslashes in /proc/self/mountinfo fields
+MOUNTINFO_ESCAPE_RE = re.compile(r"\\([0-7]{3})")
+
+# Parsed NFS mounts per remote host, reused within a single command invocation
+_mounts_cache = {}
+
+# Hosts whose shared ssh connection has been set up (True) or failed to set up (False)
+_control_masters = {}
+_control_master_locks = {}
+_control_master_locks_lock = threading.Lock()
+
+
+def run_command(argv, timeout=5, capture_stdout=True, input=None):
+    """Execute a command given as an argv list and return (stdout, error).
+
+    With capture_stdout=False the command's stdout is discarded and "" is returned for it.
+    input, if given, is written to the command's stdin.
+    """
     try:
         result = subprocess.run(
-            command,
-            stdout=subprocess.PIPE,
+            argv,
+            input=input,
+            stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
             stderr=subprocess.PIPE,
             text=True,
             check=True,
-            shell=True,
             timeout=timeout
         )
-        return result.stdout.strip(), None
+        return (result.stdout.strip() if capture_stdout else ""), None
     except subprocess.TimeoutExpired as e:
         return None, f"Command timed out: {e}"
     except subprocess.CalledProcessError as e:
@@ -91,40 +277,55 @@ def run_command(command, timeout=5):
         return None, str(e)
 
 
-def get_current_mounts():
-    """Get current NFS mounts. Returns list of mount info dicts or None on error."""
-    out, err = run_command("findmnt -t nfs --json")
-    if err:
-        # Check if it's just "no mounts found" vs actual error
-        if "no mounts found" in str(err).lower() or out == "":
-            return []
-        print(f"Error getting current mounts: {err}")
-        return None
+def _unescape_mountinfo(field):
+    """Decode the octal escapes (e.g. \\040 for a space) used in /proc/self/mountinfo."""
+    return MOUNTINFO_ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 8)), field)
 
-    if not out:
-        return []
 
+def parse_nfs_mountinfo(lines):
+    """Yield {mount_point, source, options} for each NFS mount in /proc/self/mountinfo lines."""
+    for line in lines:
+        fields = line.split()
+        # Optional fields end with a lone "-", followed by fstype, source and super options
+        try:
+            sep = fields.index("-")
+        except ValueError:
+            continue
+        if len(fields) < sep + 4 or fields[sep + 1] != "nfs":
+            continue
+
+        # Combine per-mount and superblock options the way findmnt reports them
+        vfs_options = fields[5].split(",")
+        options = vfs_options + [o for o in fields[sep + 3].split(",") if o not in vfs_options]
+
+        yield {
+            "mount_point": _unescape_mountinfo(fields[4]),
+            "source": _unescape_mountinfo(fields[sep + 2]),
+            "options": ",".join(options)
+        }
+
+
+def get_current_mounts():
+    """Get current NFS mounts. Returns list of mount info dicts or None on error."""
     try:
-        mounts_json = json.loads(out)
-    except json.JSONDecodeError as e:
-        print(f"Error parsing mount info: {e}")
+        with open("/proc/self/mountinfo", "r") as f:
+            entries = list(parse_nfs_mountinfo(f))
+    except OSError as e:
+        print(f"Error getting current mounts: {e}")
         return None
 
     mounts = []
-    for target in mounts_json.get("filesystems", []):
-        source = target.get("source", "")
-        mount_point = target.get("target", "")
-        options = target.get("options", "")
+    for entry in entries:
+        source = entry["source"]
+        mount_point = entry["mount_point"]
+        options = entry["options"]
 
-        if ":/volumes/" not in source:
+        # Extract IP and volume ID from source (format: IP:/volumes/VOLUME_ID)
+        ip_address, sep, volume_id = source.partition(":/volumes/")
+        if not sep:
             print(f"Warning: Skipping non-Crusoe NFS mount: {source}")
             continue
 
-        # Extract IP and volume ID from source (format: IP:/volumes/VOLUME_ID)
-        parts = source.split(":/volumes/")
-        ip_address = parts[0]
-        volume_id = parts[1]
-
         mounts.append({
             "mount_point": mount_point,
             "volume_id": volume_id,
@@ -136,51 +337,100 @@ def get_current_mounts():
 
 
 def verify_dns_reachable():
-    """Check if the NFS domain is reachable."""
-    _, err = run_command(f"ping -c 1 {CRUSOE_NFS_DOMAIN}")
-    return err is None
+    """Check if the NFS domain resolves and accepts TCP connections on the NFS port."""
+    import socket
+
+    try:
+        infos = socket.getaddrinfo(CRUSOE_NFS_DOMAIN, NFS_PORT, type=socket.SOCK_STREAM)
+        family, socktype, proto, _, address = infos[0]
+        with socket.socket(family, socktype, proto) as s:
+            s.settimeout(2.0)
+            s.connect(address)
+        return True
+    except OSError:
+        return False
 
 
 def ensure_crusoe_dir():
     """Create ./crusoe directory if it doesn't exist."""
-    if not os.path.exists(CRUSOE_DIR):
+    try:
         os.makedirs(CRUSOE_DIR)
         print(f"Created directory: {CRUSOE_DIR}")
-    else:
+    except FileExistsError:
         print(f"Directory already exists: {CRUSOE_DIR}")
 
 
+def write_json(path, obj, pretty=False):
+    """Write obj to path as JSON, compact unless pretty is set for files meant to be read by people."""
+    if pretty and isinstance(obj, list) and len(obj) > PRETTY_JSON_MAX_ITEMS:
+        # Indenting goes through json's pure-Python encoder; one entry per line is still easy to
+        # review and edit by hand, and each entry is encoded by the C encoder (or orjson)
+        if orjson is not None:
+            entries = map(orjson.dumps, obj)
+        else:
+            entries = (json.dumps(item).encode() for item in obj)
+        with open(path, "wb") as f:
+            f.write(b"[\n  " + b",\n  ".join(entries) + b"\n]\n")
+        return
+
+    if orjson is not None:
+        try:
+            data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+        except orjson.JSONEncodeError:
+            # e.g. surrogate-escaped mount paths that weren't valid UTF-8, which json can write
+            data = None
+        if data is not None:
+            with open(path, "wb") as f:
+                f.write(data)
+            return
+
+    with open(path, "w") as f:
+        if pretty:
+            json.dump(obj, f, indent=2)
+        else:
+            json.dump(obj, f, separators=(",", ":"))
+
+
+def read_json(path):
+    """Read and decode the JSON file at path, in one read so orjson can parse it when installed."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. escaped surrogates written by json for mount paths that weren't valid UTF-8
+    return json.loads(data)
+
+
 def save_mounts(mounts):
     """Save mount information to the crusoe directory."""
-    with open(MOUNTS_FILE, "w") as f:
-        json.dump(mounts, f, indent=2)
+    write_json(MOUNTS_FILE, mounts)
     print(f"Saved {len(mounts)} mount(s) to {MOUNTS_FILE}")
 
 
 def load_mounts():
     """Load mount information from the crusoe directory."""
-    if not os.path.exists(MOUNTS_FILE):
+    try:
+        mounts = read_json(MOUNTS_FILE)
+    except FileNotFoundError:
         print(f"Error: No saved mounts found at {MOUNTS_FILE}")
         print("Please run 'unmount' first to record existing mounts.")
         return None
 
-    with open(MOUNTS_FILE, "r") as f:
-        mounts = json.load(f)
-
     print(f"Loaded {len(mounts)} mount(s) from {MOUNTS_FILE}")
     return mounts
 
 
 def load_vms():
     """Load VM list from the icat-vms.json file."""
-    if not os.path.exists(ICAT_VMS_FILE):
+    try:
+        vms = read_json(ICAT_VMS_FILE)
+    except FileNotFoundError:
         print(f"Error: No VM list found at {ICAT_VMS_FILE}")
         print("Please run 'list-vms <project_id>' first to generate the VM list.")
         return None
 
-    with open(ICAT_VMS_FILE, "r") as f:
-        vms = json.load(f)
-
     # Filter to only VMs with public IPs
     vms_with_ips = [vm for vm in vms if vm.get("public_ip")]
     vms_without_ips = [vm for vm in vms if not vm.get("public_ip")]
@@ -194,48 +444,253 @@ def load_vms():
     return vms_with_ips
 
 
-def run_remote_command(host, command, timeout=30):
-    """Execute a command on a remote host via SSH."""
-    # Prepend ubuntu@ if no user specified
+def ssh_destination(host):
+    """Return the ssh destination for a host, prepending ubuntu@ if no user is specified."""
     if "@" not in host:
-        host = f"ubuntu@{host}"
-    ssh_cmd = f"ssh -o StrictHostKeyChecking=no -o ConnectTimeout=10 {host} {shlex.quote(command)}"
-    return run_command(ssh_cmd, timeout=timeout)
+        return f"ubuntu@{host}"
+    return host
+
+
+def build_ssh_argv(host, command):
+    """Build the ssh argv that runs command on a remote host.
+
+    command is either a script string for the remote shell or an argv list,
+    which is quoted for the remote shell with shlex.join.
+    """
+    if not isinstance(command, str):
+        command = shlex.join(command)
+    return ["ssh", *SSH_OPTIONS, *SSH_CONTROL_OPTIONS, ssh_destination(host), command]
+
+
+def ensure_control_master(host, connect_timeout=10, timeout=30):
+    """Open the shared ssh connection to a host before the first command is sent to it.
+
+    Without this, the first commands sent to a VM in parallel would race to become the
+    master and most of them would each do a full handshake of their own.
+    Returns whether the connection is open.
+    """
+    with _control_master_locks_lock:
+        lock = _control_master_locks.setdefault(host, threading.Lock())
+    with lock:
+        if host in _control_masters:
+            return _control_masters[host]
+        os.makedirs(os.path.expanduser("~/.ssh"), mode=0o700, exist_ok=True)
+        # -f backgrounds ssh once authenticated; keep the master off our pipes so nothing waits on it.
+        # ssh uses the first value given for an option, so this ConnectTimeout overrides SSH_OPTIONS'
+        try:
+            result = subprocess.run(
+                [
+                    "ssh", "-o", f"ConnectTimeout={connect_timeout}", *SSH_OPTIONS, *SSH_CONTROL_OPTIONS,
+                    "-fN", ssh_destination(host)
+                ],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=timeout
+            )
+            _control_masters[host] = result.returncode == 0
+        except Exception:
+            # Commands still work without a master, each connecting on its own
+            _control_masters[host] = False
+        return _control_masters[host]
 
 
-def get_remote_mounts(host):
-    """Get current NFS mounts from a remote host. Returns list of mount info dicts or None on error."""
-    out, err = run_remote_command(host, "findmnt -t nfs --json")
-    if err:
-        # Check if it's just "no mounts found" vs actual error
-        if "no mounts found" in str(err).lower() or out == "":
-            return []
-        print(f"  Error getting mounts: {err}")
-        return None
+def is_ssh_reachable(host, connect_timeout=10, timeout=30):
+    """Return whether a host accepts ssh commands, opening its shared connection on the way.
 
-    if not out:
-        return []
+    If the shared connection can't be opened (e.g. its ControlPath socket can't be created),
+    one plain command decides, since commands still work without it. That command gets the same
+    timeouts and never becomes a master itself, which nothing would close.
+    """
+    if ensure_control_master(host, connect_timeout, timeout):
+        return True
+    # ssh uses the first value given for an option, so these override SSH_OPTIONS'
+    _, err = run_command(
+        [
+            "ssh", "-o", f"ConnectTimeout={connect_timeout}", "-o", "ControlMaster=no", *SSH_OPTIONS,
+            ssh_destination(host), "true"
+        ],
+        timeout=timeout,
+        capture_stdout=False
+    )
+    return err is None
+
+
+def precheck_vms(vms, max_workers=PRECHECK_MAX_WORKERS):
+    """Open the ssh connection to every (vm_name, vm_ip) pair up front with short timeouts.
+
+    Unreachable VMs are reported so later phases can leave them out instead of waiting on
+    their ssh timeouts. Returns (reachable, unreachable) lists of pairs, in input order.
+    """
+    if not vms:
+        return [], []
+    print(f"\nChecking SSH connectivity to {len(vms)} VM(s)...")
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(vms))) as executor:
+        answered = list(executor.map(
+            lambda vm: is_ssh_reachable(vm[1], PRECHECK_CONNECT_TIMEOUT, PRECHECK_TIMEOUT), vms
+        ))
+
+    reachable = [vm for vm, ok in zip(vms, answered) if ok]
+    unreachable = [vm for vm, ok in zip(vms, answered) if not ok]
+    if unreachable:
+        print(f"Warning: {len(unreachable)} VM(s) are unreachable over SSH and will be skipped:")
+        for vm_name, vm_ip in unreachable:
+            print(f"  - {vm_name} ({vm_ip})")
+    return reachable, unreachable
+
+
+def close_control_masters():
+    """Shut down the shared ssh connections opened by ensure_control_master."""
+    for host, opened in _control_masters.items():
+        if not opened:
+            continue
+        subprocess.run(
+            ["ssh", *SSH_CONTROL_OPTIONS, "-O", "exit", ssh_destination(host)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+
+
+def run_remote_command(host, command, timeout=30, capture_stdout=True, input=None):
+    """Execute a command on a remote host via SSH, writing input (if given) to its stdin."""
+    ensure_control_master(host)
+    return run_command(build_ssh_argv(host, command), timeout=timeout, capture_stdout=capture_stdout, input=input)
+
+
+def run_remote_batch(host, commands, timeout=60, setup=(), stages=None):
+    """Run several argv commands on a remote host through one ssh invocation.
+
+    The setup commands run first, one after another; if one fails the batch stops there.
+    Then the commands run in order of their stages (a list of numbers, one per command), each
+    stage starting once the previous one has finished. Up to MAX_COMMANDS_PER_VM commands of a
+    stage run at once; timeout applies to each command.
+    Returns (setup_failure, results): setup_failure is None or (index into setup, err), with
+    index None if ssh itself failed; results is a list of (ok, err) in the order of commands.
+    If ssh fails part way, commands that already reported keep their result.
+    """
+    if not commands:
+        return None, []
+    if stages is None:
+        stages = [0] * len(commands)
+    script = [BATCH_RUN_FUNCTION, f"t={timeout}"]
+    for i, argv in enumerate(setup):
+        script.append(f"run S{i} {shlex.join(argv)} || exit 0")
+    stage_sizes = {}
+    for i in sorted(range(len(commands)), key=lambda i: stages[i]):
+        if stage_sizes and stages[i] not in stage_sizes:
+            script.append("wait")
+        stage_sizes[stages[i]] = stage_sizes.get(stages[i], 0) + 1
+        script.append(f'while [ "$(jobs -rp | wc -l)" -ge {MAX_COMMANDS_PER_VM} ]; do wait -n; done')
+        script.append(f"run {i} {shlex.join(commands[i])} &")
+    script.append("wait")
+
+    # Each command is killed after timeout (plus 5 seconds for the kill), so this is only a backstop
+    rounds = len(setup) + sum(-(-size // MAX_COMMANDS_PER_VM) for size in stage_sizes.values())
+    results = {}
+
+    def collect(lines):
+        # Results are recorded as they arrive, so they survive ssh failing later on
+        for line in lines:
+            index, _, status = line.rstrip("\n").partition(" ")
+            status, _, message = status.partition(" ")
+            results[index] = (status == "OK", message.strip() or None)
+
+    _, err = stream_remote_command(
+        host, ["bash", "-c", "\n".join(script) + "\n"], collect, timeout=(timeout + 5) * rounds + 30
+    )
+    missing = (False, err or "No result reported")
+
+    for i in range(len(setup)):
+        ok, setup_err = results.get(f"S{i}", missing)
+        if not ok:
+            return (None if f"S{i}" not in results else i, setup_err), []
+    return None, [results.get(str(i), missing) for i in range(len(commands))]
 
+
+def stream_remote_command(host, command, consume, timeout=30):
+    """Execute a command on a remote host via SSH, feeding its stdout lines to consume() as they arrive.
+
+    Output that isn't valid UTF-8 (e.g. a mount path) is decoded with surrogateescape, so it
+    round-trips when passed back to a remote command. Returns (consume's result, error).
+    """
+    ensure_control_master(host)
     try:
-        mounts_json = json.loads(out)
-    except json.JSONDecodeError as e:
-        print(f"  Error parsing mount info: {e}")
+        proc = subprocess.Popen(
+            build_ssh_argv(host, command),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="surrogateescape"
+        )
+    except Exception as e:
+        return None, str(e)
+
+    # stderr is drained alongside stdout, so a remote filling the stderr pipe can't stall it
+    stderr_chunks = []
+    stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+    stderr_reader.start()
+    # Kill the ssh process if it outlives the timeout so the stdout read can't hang
+    timer = threading.Timer(timeout, proc.kill)
+    timer.start()
+    try:
+        result = consume(proc.stdout)
+        # Read whatever consume() left, so ssh isn't blocked writing it
+        proc.stdout.read()
+        proc.wait()
+    except Exception as e:
+        return None, str(e)
+    finally:
+        timer.cancel()
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+        stderr_reader.join()
+        proc.stderr.close()
+    stderr = "".join(stderr_chunks)
+
+    if proc.returncode < 0:
+        return None, f"Command timed out after {timeout} seconds"
+    if proc.returncode != 0:
+        return None, f"Command failed (exit {proc.returncode}): {stderr.strip()}"
+    return result, None
+
+
+def invalidate_mounts_cache(host):
+    """Forget the cached mounts of a remote host after its mount table has changed."""
+    _mounts_cache.pop(host, None)
+
+
+def get_remote_mounts(host, log=print):
+    """Get current NFS mounts from a remote host. Returns list of mount info dicts or None on error.
+
+    Errors and warnings are passed to log, so callers working on several VMs at once can buffer them.
+    """
+    if host in _mounts_cache:
+        return _mounts_cache[host]
+
+    # Read the mount table directly rather than having findmnt JSON-encode it,
+    # parsing it while ssh is still streaming it back
+    entries, err = stream_remote_command(
+        host, ["cat", "/proc/self/mountinfo"], lambda lines: list(parse_nfs_mountinfo(lines))
+    )
+    if err:
+        log(f"  Error getting mounts: {err}")
         return None
 
     mounts = []
-    for target in mounts_json.get("filesystems", []):
-        source = target.get("source", "")
-        mount_point = target.get("target", "")
-        options = target.get("options", "")
-
-        if ":/volumes/" not in source:
-            print(f"  Warning: Skipping non-Crusoe NFS mount: {source}")
-            continue
+    for entry in entries:
+        source = entry["source"]
+        mount_point = entry["mount_point"]
+        options = entry["options"]
 
         # Extract IP and volume ID from source (format: IP:/volumes/VOLUME_ID)
-        parts = source.split(":/volumes/")
-        ip_address = parts[0]
-        volume_id = parts[1]
+        ip_address, sep, volume_id = source.partition(":/volumes/")
+        if not sep:
+            log(f"  Warning: Skipping non-Crusoe NFS mount: {source}")
+            continue
 
         mounts.append({
             "mount_point": mount_point,
@@ -244,22 +699,232 @@ def get_remote_mounts(host):
             "options": options
         })
 
+    _mounts_cache[host] = mounts
     return mounts
 
 
-def do_unmount(auto_confirm):
-    """Unmount mode: create dir, record mounts, unmount all NFS on all VMs."""
+def get_remote_mount_points(host, log=print):
+    """Return the set of NFS mount points on a remote host, empty if they can't be read."""
+    return {m["mount_point"] for m in get_remote_mounts(host, log) or ()}
+
+
+def mount_nesting_depths(mount_points):
+    """Return, for each mount point, how many of the others must be mounted before it.
+
+    Those are the mount points it is nested under, and earlier mounts on the same path, which
+    it is stacked on.
+    """
+    paths = [mount_point.rstrip("/") + "/" for mount_point in mount_points]
+    return [
+        sum(1 for j, other in enumerate(paths) if path.startswith(other) and (other != path or j < i))
+        for i, path in enumerate(paths)
+    ]
+
+
+def run_per_mount(host, mounts, build_argv, timeout=60, setup=(), reverse=False):
+    """Run the command build_argv(mount) for every mount in one ssh batch, after the setup commands.
+
+    Nested mount points are handled after the ones they are under, or before them with reverse
+    (for unmounts); only unrelated mount points are worked on at the same time.
+    Returns (setup_failure, [(mount, ok, err)] in input order) as for run_remote_batch.
+    """
+    if not mounts:
+        return None, []
+    depths = mount_nesting_depths([mount["mount_point"] for mount in mounts])
+    setup_failure, results = run_remote_batch(
+        host, [build_argv(mount) for mount in mounts], timeout=timeout, setup=setup,
+        stages=[-depth for depth in depths] if reverse else depths
+    )
+    # The batch changes the mount table whether or not every command succeeded
+    invalidate_mounts_cache(host)
+    return setup_failure, [
+        (mount, ok, None if ok else f"Error: {err}")
+        for mount, (ok, err) in zip(mounts, results)
+    ]
+
+
+def run_on_all_vms(vms, fn, max_workers=MAX_PARALLEL_VMS):
+    """Run fn(vm_name, vm_ip) for every (vm_name, vm_ip) pair concurrently.
+
+    fn returns (result, log_lines). Each VM's log lines are printed as one block as soon as
+    that VM finishes, so output from different VMs never interleaves mid-block.
+    Returns {vm_name: result} in submission order.
+    """
+    if not vms:
+        return {}
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(vms))) as executor:
+        futures = {executor.submit(fn, vm_name, vm_ip): vm_name for vm_name, vm_ip in vms}
+        for future in as_completed(futures):
+            result, log_lines = future.result()
+            print("\n".join(log_lines))
+            results[futures[future]] = result
+    return {vm_name: results[vm_name] for vm_name, _ in vms}
+
+
+def _show_vm_mounts(vm_name, vm_ip):
+    """List the current NFS mounts of one VM. Returns (None, log_lines).
+
+    VMs whose mounts were not changed in this run are listed from the mounts cache without an ssh call.
+    """
+    log = [f"\n[{vm_name}] ({vm_ip}):"]
+    mounts = get_remote_mounts(vm_ip, log.append)
+    if mounts is None:
+        log.append(f"  Could not list mounts")
+    elif mounts:
+        width = max(len(m["mount_point"]) for m in mounts)
+        log += [
+            f"  {m['mount_point']:<{width}}  {m['ip_address']}:/volumes/{m['volume_id']}  {m['options']}"
+            for m in mounts
+        ]
+    else:
+        log.append("  (none)")
+    return None, log
+
+
+def warn_unreachable(unreachable, retry="run again"):
+    """Remind the user of VMs skipped by precheck_vms. Returns True if there were none."""
+    if unreachable:
+        print(f"\nWarning: {len(unreachable)} unreachable VM(s) were skipped; {retry} once they are reachable.")
+    return not unreachable
+
+
+def show_all_vm_mounts(vms):
+    """Print the current NFS mounts on every (vm_name, vm_ip) pair."""
+    print("\n" + "-" * 70)
+    print("Current NFS mounts on all VMs:")
+    print("-" * 70)
+    run_on_all_vms(vms, _show_vm_mounts)
+    print("-" * 70)
+
+
+def _unmount_argv(mount):
+    """Return the argv that unmounts a single mount."""
+    return ["sudo", "umount", mount["mount_point"]]
+
+
+def _mkdir_argv(mounts):
+    """Return the argv that creates any missing mount point directories of mounts with a single mkdir."""
+    return ["sudo", "mkdir", "-p", "--", *(m["mount_point"] for m in mounts)]
+
+
+def dns_mount_options(extra_options=""):
+    """Return the DNS mount options, with any user-supplied extra options appended."""
+    if extra_options:
+        return f"{DNS_MOUNT_OPTIONS},{extra_options}"
+    return DNS_MOUNT_OPTIONS
+
+
+def _remount_argv(mount, mount_options):
+    """Return the argv that mounts a single saved volume using DNS."""
+    return [
+        "sudo", "mount", "-o", mount_options,
+        f"{CRUSOE_NFS_DOMAIN}:/volumes/{mount['volume_id']}", mount["mount_point"]
+    ]
+
+
+def _rollback_argv(mount):
+    """Return the argv that mounts a single saved volume using its original IP."""
+    mount_point = mount["mount_point"]
+    volume_id = mount["volume_id"]
+    ip_address = mount["ip_address"]
+    options = mount.get("options", "")
+
+    # Remove DNS-specific mount options that shouldn't be used with IP-based mounts
+    if options:
+        opts = options.split(",")
+        opts = [o for o in opts if not o.startswith("x-systemd.") and o != "remoteports=dns"]
+        options = ",".join(opts)
+
+    # Use original options if available, otherwise use basic options
+    if options:
+        return ["sudo", "mount", "-o", options, f"{ip_address}:/volumes/{volume_id}", mount_point]
+    return ["sudo", "mount", "-t", "nfs", f"{ip_address}:/volumes/{volume_id}", mount_point]
+
+
+def _collect_vm_mounts(vm_name, vm_ip):
+    """Record the NFS mounts of one VM. Returns (mounts or None, log_lines)."""
+    log = [f"\n[{vm_name}] ({vm_ip})"]
+
+    mounts = get_remote_mounts(vm_ip, log.append)
+    if mounts is None:
+        log.append(f"  Failed to get mounts, skipping this VM")
+        return None, log
+
+    if len(mounts) == 0:
+        log.append(f"  No NFS mounts found")
+    else:
+        log.append(f"  Found {len(mounts)} NFS mount(s):")
+        log += [f"    - {mount['volume_id']} at {mount['mount_point']}" for mount in mounts]
+    return mounts, log
+
+
+def merge_vm_mounts(saved, collected):
+    """Merge the mounts collected by this unmount run into those saved by earlier runs.
+
+    A mount point that is mounted now takes its current entry, so a changed volume or IP replaces
+    the saved one. A saved mount point that isn't mounted now is kept: an earlier run unmounted it,
+    and remount/rollback still need its entry. A VM that is unreachable now keeps its saved mounts.
+    """
+    merged = dict(saved)
+    for vm_name, vm_data in collected.items():
+        current_mount_points = {m["mount_point"] for m in vm_data["mounts"]}
+        unmounted = [
+            m for m in saved.get(vm_name, {}).get("mounts", []) if m["mount_point"] not in current_mount_points
+        ]
+        merged[vm_name] = {**vm_data, "mounts": unmounted + vm_data["mounts"]}
+    return merged
+
+
+def _unmount_vm(vm_name, vm_ip, mounts):
+    """Unmount the given mounts on one VM. Returns ((succeeded, failed), log_lines)."""
+    log = [f"\n[{vm_name}] ({vm_ip}) - Unmounting {len(mounts)} volume(s)..."]
+    succeeded = failed = 0
+
+    _, results = run_per_mount(vm_ip, mounts, _unmount_argv, timeout=30, reverse=True)
+    for mount, ok, err in results:
+        log.append(f"  Unmounting {mount['mount_point']}...")
+        if ok:
+            log.append(f"    Success")
+            succeeded += 1
+        else:
+            log.append(f"    {err}")
+            failed += 1
+    return (succeeded, failed), log
+
+
+def do_unmount(auto_confirm, only_unreachable=False):
+    """Unmount mode: create dir, record mounts, unmount all NFS on all VMs.
+
+    With only_unreachable, only the VMs recorded as unreachable in mounts.json are processed.
+    """
     # Step a: Create ./crusoe directory
     ensure_crusoe_dir()
 
-    # Step b: Load VMs from icat-vms.json
-    vms = load_vms()
-    if vms is None:
-        return False
+    # Mounts recorded by earlier runs, which are merged with this run's rather than replaced
+    try:
+        saved_vm_mounts = read_json(MOUNTS_FILE)
+    except FileNotFoundError:
+        saved_vm_mounts = {}
+
+    # Step b: Load VMs from icat-vms.json, or the previously unreachable ones from mounts.json
+    if only_unreachable:
+        vm_ips = {
+            vm_name: vm_data["ip"] for vm_name, vm_data in saved_vm_mounts.items() if vm_data.get("unreachable")
+        }
+        if not vm_ips:
+            print(f"No VMs are recorded as unreachable in {MOUNTS_FILE}.")
+            return True
+        print(f"Loaded {len(vm_ips)} previously unreachable VM(s) from {MOUNTS_FILE}")
+    else:
+        vms = load_vms()
+        if vms is None:
+            return False
 
-    if len(vms) == 0:
-        print("No VMs to process.")
-        return True
+        if len(vms) == 0:
+            print("No VMs to process.")
+            return True
+        vm_ips = {vm["name"]: vm["public_ip"] for vm in vms}
 
     # Step c: Collect mounts from all VMs
     all_vm_mounts = {}
@@ -269,25 +934,13 @@ def do_unmount(auto_confirm):
     print("Collecting NFS mounts from all VMs...")
     print("-" * 70)
 
-    for vm in vms:
-        vm_name = vm["name"]
-        vm_ip = vm["public_ip"]
-        print(f"\n[{vm_name}] ({vm_ip})")
-
-        mounts = get_remote_mounts(vm_ip)
+    reachable, unreachable = precheck_vms(list(vm_ips.items()))
+    collected = run_on_all_vms(reachable, _collect_vm_mounts)
+    for vm_name, mounts in collected.items():
         if mounts is None:
-            print(f"  Failed to get mounts, skipping this VM")
             continue
-
-        if len(mounts) == 0:
-            print(f"  No NFS mounts found")
-        else:
-            print(f"  Found {len(mounts)} NFS mount(s):")
-            for mount in mounts:
-                print(f"    - {mount['volume_id']} at {mount['mount_point']}")
-
         all_vm_mounts[vm_name] = {
-            "ip": vm_ip,
+            "ip": vm_ips[vm_name],
             "mounts": mounts
         }
         total_mounts += len(mounts)
@@ -295,20 +948,26 @@ def do_unmount(auto_confirm):
     # Count VMs that actually have mounts (for user-facing messages)
     vms_with_mounts = sum(1 for vm_data in all_vm_mounts.values() if len(vm_data.get("mounts", [])) > 0)
 
+    # Unreachable VMs are recorded so it's clear their mounts are unknown, not absent
+    vm_mounts_to_save = merge_vm_mounts(saved_vm_mounts, {
+        **all_vm_mounts,
+        **{vm_name: {"ip": vm_ip, "mounts": [], "unreachable": True} for vm_name, vm_ip in unreachable}
+    })
+    retry = "run 'unmount --only-unreachable'"
+
     print("\n" + "-" * 70)
     print(f"Total: {total_mounts} NFS mount(s) across {vms_with_mounts} VM(s)")
     print("-" * 70)
 
     if total_mounts == 0:
-        # Don't overwrite existing mounts file if no mounts are currently found
-        if os.path.exists(MOUNTS_FILE):
-            print("No NFS mounts found. Existing mounts file preserved.")
+        # Saved mounts are kept by the merge; this only updates which VMs are unreachable
+        write_json(MOUNTS_FILE, vm_mounts_to_save)
+        if saved_vm_mounts:
+            print("No NFS mounts found. Existing saved mounts preserved.")
             print(f"(If you want to clear the saved mounts, delete {MOUNTS_FILE})")
         else:
             print("No NFS mounts found to unmount.")
-            with open(MOUNTS_FILE, "w") as f:
-                json.dump(all_vm_mounts, f, indent=2)
-        return True
+        return warn_unreachable(unreachable, retry)
 
     if not auto_confirm:
         response = input(f"This will unmount {total_mounts} NFS mount(s) across {vms_with_mounts} VM(s). Continue? (y/N) ")
@@ -317,65 +976,99 @@ def do_unmount(auto_confirm):
             return False
 
     # Save mounts before unmounting
-    with open(MOUNTS_FILE, "w") as f:
-        json.dump(all_vm_mounts, f, indent=2)
+    write_json(MOUNTS_FILE, vm_mounts_to_save)
     print(f"Saved mount information to {MOUNTS_FILE}")
 
     # Step d: Unmount all NFS mounts on all VMs
-    total_failed = 0
-    total_succeeded = 0
-
-    for vm_name, vm_data in all_vm_mounts.items():
-        vm_ip = vm_data["ip"]
-        mounts = vm_data["mounts"]
-
-        if len(mounts) == 0:
-            continue
-
-        print(f"\n[{vm_name}] ({vm_ip}) - Unmounting {len(mounts)} volume(s)...")
-
-        for mount in mounts:
-            mount_point = mount["mount_point"]
-            print(f"  Unmounting {mount_point}...")
-
-            out, err = run_remote_command(vm_ip, f"sudo umount '{mount_point}'")
-            if err:
-                print(f"    Error: {err}")
-                total_failed += 1
-            else:
-                print(f"    Success")
-                total_succeeded += 1
+    results = run_on_all_vms(
+        [(vm_name, vm_data["ip"]) for vm_name, vm_data in all_vm_mounts.items() if vm_data["mounts"]],
+        lambda vm_name, vm_ip: _unmount_vm(vm_name, vm_ip, all_vm_mounts[vm_name]["mounts"])
+    )
+    total_succeeded = sum(succeeded for succeeded, _ in results.values())
+    total_failed = sum(failed for _, failed in results.values())
 
     print(f"\nResult: {total_succeeded}/{total_mounts} unmount(s) succeeded.")
     if total_failed > 0:
         print(f"Warning: {total_failed} unmount(s) failed. Check if volumes are in use.")
+        warn_unreachable(unreachable, retry)
         return False
 
-    return True
+    return warn_unreachable(unreachable, retry)
 
 
 def load_vm_mounts():
     """Load VM mount information from the mounts file (new format)."""
-    if not os.path.exists(MOUNTS_FILE):
+    try:
+        vm_mounts = read_json(MOUNTS_FILE)
+    except FileNotFoundError:
         print(f"Error: No saved mounts found at {MOUNTS_FILE}")
         print("Please run 'unmount' first to record existing mounts.")
         return None
 
-    with open(MOUNTS_FILE, "r") as f:
-        vm_mounts = json.load(f)
-
     total_mounts = sum(len(vm_data.get("mounts", [])) for vm_data in vm_mounts.values())
     print(f"Loaded mount info for {len(vm_mounts)} VM(s) ({total_mounts} total mount(s)) from {MOUNTS_FILE}")
     return vm_mounts
 
 
-def verify_remote_dns_reachable(host):
-    """Check if the NFS domain is reachable from a remote host."""
-    _, err = run_remote_command(host, f"ping -c 1 {CRUSOE_NFS_DOMAIN}")
-    return err is None
+def _check_remount_state(vm_name, vm_ip, saved_mounts):
+    """Split one VM's saved mounts into mounted/unmounted. Returns (mounts_to_restore, log_lines)."""
+    log = [f"\n[{vm_name}] ({vm_ip})"]
 
+    # Get current mount points on this VM
+    current_mount_points = get_remote_mount_points(vm_ip, log.append)
+    mounts_to_restore = []
+    already_mounted = []
+    for m in saved_mounts:
+        (already_mounted if m["mount_point"] in current_mount_points else mounts_to_restore).append(m)
 
-def do_remount(auto_confirm):
+    if already_mounted:
+        log.append(f"  Already mounted (will skip): {len(already_mounted)}")
+        log += [f"    - {mount['volume_id']} at {mount['mount_point']}" for mount in already_mounted]
+
+    if mounts_to_restore:
+        log.append(f"  To restore: {len(mounts_to_restore)}")
+        log += [f"    - {mount['volume_id']} at {mount['mount_point']}" for mount in mounts_to_restore]
+    else:
+        log.append(f"  All volumes already mounted")
+    return mounts_to_restore, log
+
+
+def _remount_vm(vm_name, vm_ip, mounts, mount_options):
+    """Mount the given saved volumes using DNS on one VM. Returns ((succeeded, failed), log_lines)."""
+    log = [f"\n[{vm_name}] ({vm_ip}) - Remounting {len(mounts)} volume(s)..."]
+
+    # Verify DNS reachable from this VM and ensure mount point directories exist,
+    # in the same ssh invocation as the mounts themselves
+    setup_failure, results = run_per_mount(
+        vm_ip, mounts, lambda mount: _remount_argv(mount, mount_options),
+        setup=[NFS_PROBE_ARGV, _mkdir_argv(mounts)]
+    )
+    log.append(f"  Verifying NFS server is reachable...")
+    if setup_failure:
+        index, err = setup_failure
+        if index is None:
+            log.append(f"  Error: {err}")
+        elif index == 0:
+            log.append(f"  Error: Cannot reach {CRUSOE_NFS_DOMAIN} from this VM")
+        else:
+            log.append(f"  NFS server is reachable")
+            log.append(f"  Error creating mount points: {err}")
+        return (0, len(mounts)), log
+    log.append(f"  NFS server is reachable")
+
+    succeeded = failed = 0
+    for mount, ok, err in results:
+        log.append(f"  Mounting {mount['volume_id']} at {mount['mount_point']}...")
+        if ok:
+            log.append(f"    Success")
+            succeeded += 1
+        else:
+            log.append(f"    {err}")
+            failed += 1
+    return (succeeded, failed), log
+
+
+def do_remount(auto_confirm, extra_options=""):
     """Remount mode: remount saved volumes using DNS on all VMs."""
     # Load saved VM mounts
     vm_mounts = load_vm_mounts()
@@ -394,53 +1087,43 @@ def do_remount(auto_confirm):
     print("Checking current mount state on all VMs...")
     print("-" * 70)
 
+    # Leave out VMs that don't answer before any real work is sent to them
+    reachable, unreachable = precheck_vms(
+        [(vm_name, vm_data["ip"]) for vm_name, vm_data in vm_mounts.items() if vm_data.get("ip")]
+    )
+    reachable_names = {vm_name for vm_name, _ in reachable}
+
+    vms_to_check = []
     for vm_name, vm_data in vm_mounts.items():
         vm_ip = vm_data.get("ip")
-        saved_mounts = vm_data.get("mounts", [])
-
         if not vm_ip:
             print(f"\n[{vm_name}] No IP address saved, skipping")
+        elif vm_name not in reachable_names:
             continue
-
-        if len(saved_mounts) == 0:
+        elif len(vm_data.get("mounts", [])) == 0:
             print(f"\n[{vm_name}] ({vm_ip}) - No mounts saved")
-            continue
-
-        print(f"\n[{vm_name}] ({vm_ip})")
-
-        # Get current mounts on this VM
-        current_mounts = get_remote_mounts(vm_ip)
-        if current_mounts is None:
-            current_mounts = []
-
-        current_mount_points = {m["mount_point"] for m in current_mounts}
-        mounts_to_restore = [m for m in saved_mounts if m["mount_point"] not in current_mount_points]
-        already_mounted = [m for m in saved_mounts if m["mount_point"] in current_mount_points]
-
-        if already_mounted:
-            print(f"  Already mounted (will skip): {len(already_mounted)}")
-            for mount in already_mounted:
-                print(f"    - {mount['volume_id']} at {mount['mount_point']}")
+        else:
+            vms_to_check.append((vm_name, vm_ip))
 
+    checked = run_on_all_vms(
+        vms_to_check,
+        lambda vm_name, vm_ip: _check_remount_state(vm_name, vm_ip, vm_mounts[vm_name]["mounts"])
+    )
+    for vm_name, mounts_to_restore in checked.items():
         if mounts_to_restore:
-            print(f"  To restore: {len(mounts_to_restore)}")
-            for mount in mounts_to_restore:
-                print(f"    - {mount['volume_id']} at {mount['mount_point']}")
             vms_to_process[vm_name] = {
-                "ip": vm_ip,
+                "ip": vm_mounts[vm_name]["ip"],
                 "mounts": mounts_to_restore
             }
             total_to_restore += len(mounts_to_restore)
-        else:
-            print(f"  All volumes already mounted")
 
     print("\n" + "-" * 70)
     print(f"Total: {total_to_restore} mount(s) to restore across {len(vms_to_process)} VM(s)")
     print("-" * 70)
 
     if total_to_restore == 0:
-        print("\nAll volumes are already mounted on all VMs.")
-        return True
+        print("\nAll volumes are already mounted on all reachable VMs.")
+        return warn_unreachable(unreachable)
 
     if not auto_confirm:
         response = input(f"This will remount {total_to_restore} volume(s) using {CRUSOE_NFS_DOMAIN}. Continue? (y/N) ")
@@ -449,47 +1132,13 @@ def do_remount(auto_confirm):
             return False
 
     # Remount on each VM
-    total_failed = 0
-    total_succeeded = 0
-
-    for vm_name, vm_data in vms_to_process.items():
-        vm_ip = vm_data["ip"]
-        mounts = vm_data["mounts"]
-
-        print(f"\n[{vm_name}] ({vm_ip}) - Remounting {len(mounts)} volume(s)...")
-
-        # Verify DNS reachable from this VM
-        print(f"  Verifying NFS server is reachable...")
-        if not verify_remote_dns_reachable(vm_ip):
-            print(f"  Error: Cannot reach {CRUSOE_NFS_DOMAIN} from this VM")
-            total_failed += len(mounts)
-            continue
-        print(f"  NFS server is reachable")
-
-        for mount in mounts:
-            mount_point = mount["mount_point"]
-            volume_id = mount["volume_id"]
-
-            print(f"  Mounting {volume_id} at {mount_point}...")
-
-            # Ensure mount point directory exists
-            out, err = run_remote_command(vm_ip, f"sudo mkdir -p '{mount_point}'")
-            if err:
-                print(f"    Error creating mount point: {err}")
-                total_failed += 1
-                continue
-
-            mount_cmd = (
-                f"sudo mount -o vers=3,nconnect=16,spread_reads,spread_writes,remoteports=dns "
-                f"{CRUSOE_NFS_DOMAIN}:/volumes/{volume_id} '{mount_point}'"
-            )
-            out, err = run_remote_command(vm_ip, mount_cmd, timeout=60)
-            if err:
-                print(f"    Error: {err}")
-                total_failed += 1
-            else:
-                print(f"    Success")
-                total_succeeded += 1
+    mount_options = dns_mount_options(extra_options)
+    results = run_on_all_vms(
+        [(vm_name, vm_data["ip"]) for vm_name, vm_data in vms_to_process.items()],
+        lambda vm_name, vm_ip: _remount_vm(vm_name, vm_ip, vms_to_process[vm_name]["mounts"], mount_options)
+    )
+    total_succeeded = sum(succeeded for succeeded, _ in results.values())
+    total_failed = sum(failed for _, failed in results.values())
 
     print(f"\nResult: {total_succeeded}/{total_to_restore} remount(s) succeeded.")
 
@@ -497,30 +1146,101 @@ def do_remount(auto_confirm):
         print(f"Warning: {total_failed} remount(s) failed.")
 
     # Show current mounts on each VM
-    print("\n" + "-" * 70)
-    print("Current NFS mounts on all VMs:")
-    print("-" * 70)
-    for vm_name, vm_data in vm_mounts.items():
-        vm_ip = vm_data.get("ip")
-        if not vm_ip:
-            continue
-        print(f"\n[{vm_name}] ({vm_ip}):")
-        out, err = run_remote_command(vm_ip, "findmnt -t nfs")
-        if err:
-            print(f"  Could not list mounts: {err}")
-        else:
-            if out:
-                for line in out.split("\n"):
-                    print(f"  {line}")
-            else:
-                print("  (none)")
-    print("-" * 70)
+    show_all_vm_mounts(reachable)
 
     if total_failed == 0:
         print(f"\nNote: {MOUNTS_FILE} preserved for rollback if needed.")
         print("Run 'rollback' to revert to IP-based mounts, or delete the file manually.")
 
-    return total_failed == 0
+    return warn_unreachable(unreachable) and total_failed == 0
+
+
+def _check_rollback_state(vm_name, vm_ip, saved_mounts):
+    """Work out which of one VM's saved mounts to roll back. Returns (vm_data or None, log_lines)."""
+    log = []
+
+    # Filter to mounts that have original IP addresses saved
+    mounts_with_ips = []
+    missing_ip_count = 0
+    for m in saved_mounts:
+        if m.get("ip_address"):
+            mounts_with_ips.append(m)
+        else:
+            missing_ip_count += 1
+
+    if len(mounts_with_ips) == 0:
+        log.append(f"\n[{vm_name}] ({vm_ip}) - No mounts with saved IPs")
+        return None, log
+
+    if missing_ip_count:
+        log.append(f"\n[{vm_name}] ({vm_ip}) - Warning: {missing_ip_count} mount(s) missing IP addresses")
+
+    log.append(f"\n[{vm_name}] ({vm_ip})")
+
+    # Get current mount points on this VM
+    current_mount_points = get_remote_mount_points(vm_ip, log.append)
+
+    # Split into mounted/unmounted while listing, so the rollback step needn't re-check
+    to_unmount = []
+    not_mounted = []
+    log.append(f"  Mounts to rollback: {len(mounts_with_ips)}")
+    for mount in mounts_with_ips:
+        if mount["mount_point"] in current_mount_points:
+            to_unmount.append(mount)
+            status = "(currently mounted)"
+        else:
+            not_mounted.append(mount)
+            status = "(not mounted)"
+        log.append(f"    - {mount['volume_id']} at {mount['mount_point']} {status}")
+        log.append(f"      Original IP: {mount['ip_address']}")
+
+    return {
+        "ip": vm_ip,
+        "mounts": mounts_with_ips,
+        "to_unmount": to_unmount,
+        "not_mounted": not_mounted
+    }, log
+
+
+def _rollback_vm(vm_name, vm_ip, vm_data):
+    """Unmount and remount one VM's volumes using their original IPs. Returns ((succeeded, failed), log_lines)."""
+    mounts = vm_data["mounts"]
+    log = [f"\n[{vm_name}] ({vm_ip}) - Rolling back {len(mounts)} volume(s)..."]
+
+    # First unmount any currently mounted volumes
+    unmount_failed = False
+    _, results = run_per_mount(vm_ip, vm_data["to_unmount"], _unmount_argv, timeout=30, reverse=True)
+    for mount, ok, err in results:
+        log.append(f"  Unmounting {mount['mount_point']}...")
+        if ok:
+            log.append(f"    Success")
+        else:
+            log.append(f"    {err}")
+            unmount_failed = True
+
+    if unmount_failed:
+        log.append(f"    Skipping remaining mounts on this VM")
+        return (0, len(mounts)), log
+
+    # Remount using original IPs, first ensuring mount point directories exist
+    # (ones that were just unmounted already do)
+    setup = [_mkdir_argv(vm_data["not_mounted"])] if vm_data["not_mounted"] else []
+    setup_failure, results = run_per_mount(vm_ip, mounts, _rollback_argv, setup=setup)
+    if setup_failure:
+        index, err = setup_failure
+        log.append(f"  Error: {err}" if index is None else f"  Error creating mount points: {err}")
+        return (0, len(mounts)), log
+
+    succeeded = failed = 0
+    for mount, ok, err in results:
+        log.append(f"  Mounting {mount['volume_id']} at {mount['mount_point']} using {mount['ip_address']}...")
+        if ok:
+            log.append(f"    Success")
+            succeeded += 1
+        else:
+            log.append(f"    {err}")
+            failed += 1
+    return (succeeded, failed), log
 
 
 def do_rollback(auto_confirm):
@@ -542,44 +1262,23 @@ def do_rollback(auto_confirm):
     print("-" * 70)
 
     for vm_name, vm_data in vm_mounts.items():
-        vm_ip = vm_data.get("ip")
-        saved_mounts = vm_data.get("mounts", [])
-
-        if not vm_ip:
+        if not vm_data.get("ip"):
             print(f"\n[{vm_name}] No IP address saved, skipping")
-            continue
 
-        # Filter to mounts that have original IP addresses saved
-        mounts_with_ips = [m for m in saved_mounts if m.get("ip_address")]
+    # Leave out VMs that don't answer before any real work is sent to them
+    reachable, unreachable = precheck_vms(
+        [(vm_name, vm_data["ip"]) for vm_name, vm_data in vm_mounts.items() if vm_data.get("ip")]
+    )
 
-        if len(mounts_with_ips) == 0:
-            print(f"\n[{vm_name}] ({vm_ip}) - No mounts with saved IPs")
+    checked = run_on_all_vms(
+        reachable,
+        lambda vm_name, vm_ip: _check_rollback_state(vm_name, vm_ip, vm_mounts[vm_name].get("mounts", []))
+    )
+    for vm_name, vm_data in checked.items():
+        if vm_data is None:
             continue
-
-        if len(mounts_with_ips) < len(saved_mounts):
-            print(f"\n[{vm_name}] ({vm_ip}) - Warning: {len(saved_mounts) - len(mounts_with_ips)} mount(s) missing IP addresses")
-
-        print(f"\n[{vm_name}] ({vm_ip})")
-
-        # Get current mounts on this VM
-        current_mounts = get_remote_mounts(vm_ip)
-        if current_mounts is None:
-            current_mounts = []
-
-        current_mount_points = {m["mount_point"] for m in current_mounts}
-
-        print(f"  Mounts to rollback: {len(mounts_with_ips)}")
-        for mount in mounts_with_ips:
-            status = "(currently mounted)" if mount["mount_point"] in current_mount_points else "(not mounted)"
-            print(f"    - {mount['volume_id']} at {mount['mount_point']} {status}")
-            print(f"      Original IP: {mount['ip_address']}")
-
-        vms_to_process[vm_name] = {
-            "ip": vm_ip,
-            "mounts": mounts_with_ips,
-            "current_mount_points": current_mount_points
-        }
-        total_to_rollback += len(mounts_with_ips)
+        vms_to_process[vm_name] = vm_data
+        total_to_rollback += len(vm_data["mounts"])
 
     print("\n" + "-" * 70)
     print(f"Total: {total_to_rollback} mount(s) to rollback across {len(vms_to_process)} VM(s)")
@@ -587,7 +1286,7 @@ def do_rollback(auto_confirm):
 
     if total_to_rollback == 0:
         print("\nNo mounts to rollback.")
-        return True
+        return warn_unreachable(unreachable)
 
     if not auto_confirm:
         response = input(f"This will rollback {total_to_rollback} volume(s) to IP-based mounts. Continue? (y/N) ")
@@ -596,69 +1295,12 @@ def do_rollback(auto_confirm):
             return False
 
     # Rollback on each VM
-    total_failed = 0
-    total_succeeded = 0
-
-    for vm_name, vm_data in vms_to_process.items():
-        vm_ip = vm_data["ip"]
-        mounts = vm_data["mounts"]
-        current_mount_points = vm_data["current_mount_points"]
-
-        print(f"\n[{vm_name}] ({vm_ip}) - Rolling back {len(mounts)} volume(s)...")
-
-        # First unmount any currently mounted volumes
-        unmount_failed = False
-        for mount in mounts:
-            mount_point = mount["mount_point"]
-            if mount_point in current_mount_points:
-                print(f"  Unmounting {mount_point}...")
-                out, err = run_remote_command(vm_ip, f"sudo umount '{mount_point}'")
-                if err:
-                    print(f"    Error: {err}")
-                    print(f"    Skipping remaining mounts on this VM")
-                    unmount_failed = True
-                    total_failed += len(mounts)
-                    break
-                print(f"    Success")
-
-        if unmount_failed:
-            continue
-
-        # Remount using original IPs
-        for mount in mounts:
-            mount_point = mount["mount_point"]
-            volume_id = mount["volume_id"]
-            ip_address = mount["ip_address"]
-            options = mount.get("options", "")
-
-            # Remove DNS-specific mount options that shouldn't be used with IP-based mounts
-            if options:
-                opts = options.split(",")
-                opts = [o for o in opts if not o.startswith("x-systemd.") and o != "remoteports=dns"]
-                options = ",".join(opts)
-
-            print(f"  Mounting {volume_id} at {mount_point} using {ip_address}...")
-
-            # Ensure mount point directory exists
-            out, err = run_remote_command(vm_ip, f"sudo mkdir -p '{mount_point}'")
-            if err:
-                print(f"    Error creating mount point: {err}")
-                total_failed += 1
-                continue
-
-            # Use original options if available, otherwise use basic options
-            if options:
-                mount_cmd = f"sudo mount -o {options} {ip_address}:/volumes/{volume_id} '{mount_point}'"
-            else:
-                mount_cmd = f"sudo mount -t nfs {ip_address}:/volumes/{volume_id} '{mount_point}'"
-
-            out, err = run_remote_command(vm_ip, mount_cmd, timeout=60)
-            if err:
-                print(f"    Error: {err}")
-                total_failed += 1
-            else:
-                print(f"    Success")
-                total_succeeded += 1
+    results = run_on_all_vms(
+        [(vm_name, vm_data["ip"]) for vm_name, vm_data in vms_to_process.items()],
+        lambda vm_name, vm_ip: _rollback_vm(vm_name, vm_ip, vms_to_process[vm_name])
+    )
+    total_succeeded = sum(succeeded for succeeded, _ in results.values())
+    total_failed = sum(failed for _, failed in results.values())
 
     print(f"\nResult: {total_succeeded}/{total_to_rollback} rollback mount(s) succeeded.")
 
@@ -666,78 +1308,111 @@ def do_rollback(auto_confirm):
         print(f"Warning: {total_failed} rollback mount(s) failed.")
 
     # Show current mounts on each VM
-    print("\n" + "-" * 70)
-    print("Current NFS mounts on all VMs:")
-    print("-" * 70)
-    for vm_name, vm_data in vm_mounts.items():
-        vm_ip = vm_data.get("ip")
-        if not vm_ip:
-            continue
-        print(f"\n[{vm_name}] ({vm_ip}):")
-        out, err = run_remote_command(vm_ip, "findmnt -t nfs")
-        if err:
-            print(f"  Could not list mounts: {err}")
-        else:
-            if out:
-                for line in out.split("\n"):
-                    print(f"  {line}")
-            else:
-                print("  (none)")
-    print("-" * 70)
+    show_all_vm_mounts(reachable)
 
-    return total_failed == 0
+    return warn_unreachable(unreachable) and total_failed == 0
 
 
-def process_fstab_content(content):
+def dns_fstab_suffix(extra_options=""):
+    """Return the type, options, dump and pass fields for a DNS-based fstab entry."""
+    return f"nfs {dns_mount_options(extra_options)},{DNS_FSTAB_OPTIONS} 0 0"
+
+
+def process_fstab_content(content, extra_options=""):
     """Process fstab content and return (new_lines, nfs_count)."""
     lines = content.split("\n")
+    fstab_suffix = dns_fstab_suffix(extra_options)
     new_lines = []
     nfs_count = 0
 
     for line in lines:
-        # Preserve comments and empty lines
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#"):
+        # Comments, empty lines and non-Crusoe NFS entries are preserved as-is;
+        # the substring test spares most lines the regex match
+        m = ":/volumes/" in line and FSTAB_NFS_RE.match(line)
+        if not m or m.group(1) == CRUSOE_NFS_DOMAIN:
             new_lines.append(line)
             continue
 
-        parts = line.split()
-        if len(parts) < 4:
-            new_lines.append(line)
-            continue
+        # Rewrite the entry to use DNS for the same volume ID and mount point
+        volume_id, mount_point = m.group(2), m.group(3)
+        new_lines.append(f"{CRUSOE_NFS_DOMAIN}:/volumes/{volume_id} {mount_point} {fstab_suffix}")
+        nfs_count += 1
 
-        # Check if this is an NFS mount
-        fs_type = parts[2] if len(parts) > 2 else ""
-        if fs_type != "nfs":
-            new_lines.append(line)
-            continue
+    return new_lines, nfs_count
 
-        source = parts[0]
-        mount_point = parts[1]
 
-        # Check if it's a Crusoe NFS mount that needs migration
-        if ":/volumes/" not in source:
-            new_lines.append(line)
-            continue
+def _read_vm_fstab(vm_name, vm_ip, extra_options=""):
+    """Read and rewrite one VM's /etc/fstab. Returns (vm_data or None if nothing to migrate, log_lines)."""
+    log = [f"\n[{vm_name}] ({vm_ip})"]
 
-        # Check if already using DNS
-        if source.startswith(CRUSOE_NFS_DOMAIN):
-            new_lines.append(line)
-            continue
+    out, err = run_remote_command(vm_ip, ["cat", "/etc/fstab"])
+    if err:
+        log.append(f"  Error reading /etc/fstab: {err}")
+        return None, log
+
+    new_lines, nfs_count = process_fstab_content(out, extra_options)
+
+    if nfs_count == 0:
+        log.append(f"  No fstab entries need to be migrated")
+        return None, log
+
+    log.append(f"  {nfs_count} NFS entry/entries to migrate")
+    return {
+        "ip": vm_ip,
+        "original": out,
+        "new_lines": new_lines,
+        "nfs_count": nfs_count
+    }, log
+
+
+def fstab_sed_script(extra_options=""):
+    """Return a sed -E script that applies process_fstab_content's rewrite to a file in place."""
+    domain = re.escape(CRUSOE_NFS_DOMAIN)
+    # Escape the characters that are special in a sed replacement using | as delimiter
+    suffix = re.sub(r"([\\&|])", r"\\\1", dns_fstab_suffix(extra_options))
+    return (
+        # Entries already using DNS are left alone
+        f"\\|^[[:space:]]*{domain}:/volumes/|b\n"
+        "s|^[[:space:]]*([^#[:space:]][^[:space:]]*):/volumes/([^[:space:]]+)[[:space:]]+([^[:space:]]+)"
+        "[[:space:]]+nfs[[:space:]]+[^[:space:]]+.*$"
+        f"|{CRUSOE_NFS_DOMAIN}:/volumes/\\2 \\3 {suffix}|"
+    )
 
-        # Extract volume ID and create new line
-        volume_id = source.split(":/volumes/")[1]
-        new_line = (
-            f"{CRUSOE_NFS_DOMAIN}:/volumes/{volume_id} {mount_point} "
-            f"nfs vers=3,nconnect=16,spread_reads,spread_writes,remoteports=dns,_netdev,nofail,x-systemd.automount,x-systemd.idle-timeout=30 0 0"
-        )
-        new_lines.append(new_line)
-        nfs_count += 1
 
-    return new_lines, nfs_count
+def _write_vm_fstab(vm_name, vm_ip, new_lines, extra_options=""):
+    """Rewrite one VM's /etc/fstab in place to match new_lines. Returns (ok, log_lines)."""
+    log = [f"\n[{vm_name}] ({vm_ip}) - Updating /etc/fstab..."]
+
+    # Keep a copy of the original as /etc/fstab.bak, then sed into a sibling temp file, fsync it
+    # and rename it over /etc/fstab, so the VM sees either the old or the new file, never a
+    # missing or partially written one. Rewriting on the VM means the file never has to be
+    # sent back over ssh
+    domain = re.escape(CRUSOE_NFS_DOMAIN)
+    update_script = f"""set -e
+cp -p /etc/fstab /etc/fstab.bak
+tmp=$(mktemp /etc/fstab.XXXXXX)
+trap 'rm -f "$tmp"' EXIT
+sed -E {shlex.quote(fstab_sed_script(extra_options))} /etc/fstab > "$tmp"
+chmod 644 "$tmp"
+sync "$tmp"
+mv "$tmp" /etc/fstab
+sync /etc
+grep -c -E '^[[:space:]]*{domain}:/volumes/' /etc/fstab || true
+"""
+    out, err = run_remote_command(vm_ip, ["sudo", "sh", "-c", update_script])
+    if err:
+        log.append(f"  Error: {err}")
+        return False, log
+
+    # The file may have changed since it was read for the preview
+    expected = sum(1 for line in new_lines if line.lstrip().startswith(f"{CRUSOE_NFS_DOMAIN}:/volumes/"))
+    if out != str(expected):
+        log.append(f"  Warning: expected {expected} DNS entries in /etc/fstab, found {out}")
+    log.append(f"  Success")
+    return True, log
 
 
-def update_fstab(auto_confirm):
+def update_fstab(auto_confirm, extra_options=""):
     """Update /etc/fstab to use DNS instead of IP-based mounts on all VMs."""
     # Load VMs from icat-vms.json
     vms = load_vms()
@@ -756,52 +1431,38 @@ def update_fstab(auto_confirm):
     print("Checking /etc/fstab on all VMs...")
     print("-" * 70)
 
-    for vm in vms:
-        vm_name = vm["name"]
-        vm_ip = vm["public_ip"]
-
-        print(f"\n[{vm_name}] ({vm_ip})")
-
-        out, err = run_remote_command(vm_ip, "cat /etc/fstab")
-        if err:
-            print(f"  Error reading /etc/fstab: {err}")
+    reachable, unreachable = precheck_vms([(vm["name"], vm["public_ip"]) for vm in vms])
+    checked = run_on_all_vms(
+        reachable,
+        lambda vm_name, vm_ip: _read_vm_fstab(vm_name, vm_ip, extra_options)
+    )
+    for vm_name, vm_data in checked.items():
+        if vm_data is None:
             continue
-
-        new_lines, nfs_count = process_fstab_content(out)
-
-        if nfs_count == 0:
-            print(f"  No fstab entries need to be migrated")
-        else:
-            print(f"  {nfs_count} NFS entry/entries to migrate")
-            vms_to_update[vm_name] = {
-                "ip": vm_ip,
-                "original": out,
-                "new_lines": new_lines,
-                "nfs_count": nfs_count
-            }
-            total_nfs_entries += nfs_count
+        vms_to_update[vm_name] = vm_data
+        total_nfs_entries += vm_data["nfs_count"]
 
     print("\n" + "-" * 70)
     print(f"Total: {total_nfs_entries} fstab entry/entries to update across {len(vms_to_update)} VM(s)")
     print("-" * 70)
 
     if total_nfs_entries == 0:
-        print("\nNo fstab entries need to be migrated on any VM.")
-        return True
+        print("\nNo fstab entries need to be migrated on any reachable VM.")
+        return warn_unreachable(unreachable)
 
     # Show detailed changes for each VM
     for vm_name, vm_data in vms_to_update.items():
-        print(f"\n[{vm_name}] ({vm_data['ip']}) - {vm_data['nfs_count']} entry/entries to update:")
-        print("-" * 40)
-        print("Original:")
-        for line in vm_data["original"].split("\n"):
-            if ":/volumes/" in line and not line.startswith(CRUSOE_NFS_DOMAIN):
-                print(f"  {line}")
-        print("New:")
-        for line in vm_data["new_lines"]:
-            if CRUSOE_NFS_DOMAIN in line:
-                print(f"  {line}")
-        print("-" * 40)
+        # Build each VM's diff as one block so it is written in a single call
+        block = [f"\n[{vm_name}] ({vm_data['ip']}) - {vm_data['nfs_count']} entry/entries to update:", "-" * 40]
+        block.append("Original:")
+        block += [
+            f"  {line}" for line in vm_data["original"].split("\n")
+            if ":/volumes/" in line and not line.startswith(CRUSOE_NFS_DOMAIN)
+        ]
+        block.append("New:")
+        block += [f"  {line}" for line in vm_data["new_lines"] if CRUSOE_NFS_DOMAIN in line]
+        block.append("-" * 40)
+        print("\n".join(block))
 
     if not auto_confirm:
         response = input(f"\nUpdate fstab on {len(vms_to_update)} VM(s)? (y/N) ")
@@ -810,44 +1471,77 @@ def update_fstab(auto_confirm):
             return False
 
     # Update fstab on each VM
-    total_failed = 0
-    total_succeeded = 0
+    results = run_on_all_vms(
+        [(vm_name, vm_data["ip"]) for vm_name, vm_data in vms_to_update.items()],
+        lambda vm_name, vm_ip: _write_vm_fstab(vm_name, vm_ip, vms_to_update[vm_name]["new_lines"], extra_options)
+    )
+    total_succeeded = sum(1 for ok in results.values() if ok)
+    total_failed = len(results) - total_succeeded
 
-    for vm_name, vm_data in vms_to_update.items():
-        vm_ip = vm_data["ip"]
-        new_lines = vm_data["new_lines"]
+    print(f"\nResult: {total_succeeded}/{len(vms_to_update)} fstab update(s) succeeded.")
 
-        print(f"\n[{vm_name}] ({vm_ip}) - Updating /etc/fstab...")
+    if total_failed > 0:
+        print(f"Warning: {total_failed} fstab update(s) failed.")
 
-        # Create new fstab content
-        new_content = "\n".join(new_lines)
-        if not new_content.endswith("\n"):
-            new_content += "\n"
+    return warn_unreachable(unreachable) and total_failed == 0
 
-        # Write to temp file on remote host and copy to /etc/fstab
-        # Use base64 encoding to safely transfer content
-        encoded_content = base64.b64encode(new_content.encode()).decode()
 
-        update_cmd = (
-            f"echo '{encoded_content}' | base64 -d > /tmp/fstab.new && "
-            f"sudo cp /tmp/fstab.new /etc/fstab && "
-            f"rm /tmp/fstab.new"
-        )
+def iter_vm_list(out):
+    """Yield the VM objects from the crusoe CLI's JSON VM list.
 
-        out, err = run_remote_command(vm_ip, update_cmd)
-        if err:
-            print(f"  Error: {err}")
-            total_failed += 1
+    Large lists are parsed incrementally when ijson is available, so only one VM's
+    objects exist at a time instead of the whole decoded list.
+    """
+    if len(out) > VM_LIST_STREAM_MIN_BYTES:
+        try:
+            import io
+            import ijson  # optional
+        except ImportError:
+            pass
         else:
-            print(f"  Success")
-            total_succeeded += 1
+            return ijson.items(io.BytesIO(out.encode()), "item")
+    return iter(orjson.loads(out) if orjson is not None else json.loads(out))
+
+
+def _first_public_ip(vm):
+    """Return the first public IPv4 address across a VM's network interfaces, or None."""
+    return next(
+        (
+            ip_info["public_ipv4"]["address"]
+            for nic in vm.get("network_interfaces", [])
+            for ip_info in nic.get("ips", [])
+            if (ip_info.get("public_ipv4") or {}).get("address")
+        ),
+        None
+    )
 
-    print(f"\nResult: {total_succeeded}/{len(vms_to_update)} fstab update(s) succeeded.")
 
-    if total_failed > 0:
-        print(f"Warning: {total_failed} fstab update(s) failed.")
+def filter_vms(vms_json):
+    """Return the VMs in TARGET_LOCATION that have a public IP, as icat-vms.json entries."""
+    # Location is checked first so interfaces are only walked for VMs in TARGET_LOCATION
+    candidates = (
+        (vm, _first_public_ip(vm)) for vm in vms_json
+        if vm.get("location", "") == TARGET_LOCATION
+    )
+    # Only include VMs that have public IPs (i.e., are running)
+    return [
+        {
+            "name": vm.get("name", ""),
+            "id": vm.get("id", ""),
+            "public_ip": public_ip,
+            "location": TARGET_LOCATION
+        }
+        for vm, public_ip in candidates if public_ip
+    ]
+
 
-    return total_failed == 0
+def remove_stale_vm_list():
+    """Remove an icat-vms.json left by an earlier list-vms, so later commands don't act on old VMs."""
+    try:
+        os.remove(ICAT_VMS_FILE)
+    except FileNotFoundError:
+        return
+    print(f"Removed the previous VM list at {ICAT_VMS_FILE}")
 
 
 def do_list_vms(project_id, auto_confirm):
@@ -858,7 +1552,7 @@ def do_list_vms(project_id, auto_confirm):
     # Step b: Get VMs from Crusoe CLI
     print(f"\nFetching VMs for project {project_id}...")
     out, err = run_command(
-        f"crusoe compute vms list --project-id {project_id} -f json",
+        ["crusoe", "compute", "vms", "list", "--project-id", project_id, "-f", "json"],
         timeout=60
     )
     if err:
@@ -867,46 +1561,19 @@ def do_list_vms(project_id, auto_confirm):
 
     if not out:
         print("No VMs found.")
+        remove_stale_vm_list()
         return True
 
+    # Step c: Filter VMs by location and extract name/public IP
     try:
-        vms_json = json.loads(out)
-    except json.JSONDecodeError as e:
+        filtered_vms = filter_vms(iter_vm_list(out))
+    except Exception as e:  # json.JSONDecodeError, or ijson's JSONError when streaming
         print(f"Error parsing VM list: {e}")
         return False
 
-    # Step c: Filter VMs by location and extract name/public IP
-    filtered_vms = []
-    for vm in vms_json:
-        location = vm.get("location", "")
-        if location != TARGET_LOCATION:
-            continue
-
-        vm_name = vm.get("name", "")
-        vm_id = vm.get("id", "")
-        public_ip = None
-
-        # Extract public IP from network interfaces
-        for nic in vm.get("network_interfaces", []):
-            for ip_info in nic.get("ips", []):
-                public_ipv4 = ip_info.get("public_ipv4", {})
-                if public_ipv4 and public_ipv4.get("address"):
-                    public_ip = public_ipv4["address"]
-                    break
-            if public_ip:
-                break
-
-        # Only include VMs that have public IPs (i.e., are running)
-        if public_ip:
-            filtered_vms.append({
-                "name": vm_name,
-                "id": vm_id,
-                "public_ip": public_ip,
-                "location": location
-            })
-
     if len(filtered_vms) == 0:
         print(f"No running VMs found in {TARGET_LOCATION} location.")
+        remove_stale_vm_list()
         return True
 
     # Step d: Display VMs to user
@@ -922,8 +1589,9 @@ def do_list_vms(project_id, auto_confirm):
     print(f"Total: {len(filtered_vms)} VM(s)")
 
     # Step e: Save to file
-    with open(ICAT_VMS_FILE, "w") as f:
-        json.dump(filtered_vms, f, indent=2)
+    # Indented, since the user is asked to review and edit this file
+    write_json(ICAT_VMS_FILE, filtered_vms, pretty=True)
+    saved_mtime = os.stat(ICAT_VMS_FILE).st_mtime_ns
     print(f"\nSaved VM list to {ICAT_VMS_FILE}")
 
     # Step f: Ask user to review and modify if needed
@@ -935,10 +1603,12 @@ def do_list_vms(project_id, auto_confirm):
             print("Operation canceled.")
             return False
 
-        # Reload the file in case user modified it
+        # Reload the file if the user modified it
         try:
-            with open(ICAT_VMS_FILE, "r") as f:
-                modified_vms = json.load(f)
+            if os.stat(ICAT_VMS_FILE).st_mtime_ns == saved_mtime:
+                modified_vms = filtered_vms
+            else:
+                modified_vms = read_json(ICAT_VMS_FILE)
             if len(modified_vms) != len(filtered_vms):
                 print(f"\nVM list updated: {len(modified_vms)} VM(s) remaining.")
         except Exception as e:
@@ -948,118 +1618,77 @@ def do_list_vms(project_id, auto_confirm):
     return True
 
 
-def do_verify_mounts():
-    """Verify NFS mounts on all VMs, testing read and write access."""
-    # Load VMs from icat-vms.json
-    vms = load_vms()
-    if vms is None:
-        return False
+# One line of the verify-mounts table: host, count, read, write, mount points
+_verify_row = "{:<30} {:<6} {:<6} {:<6} {}".format
 
-    if len(vms) == 0:
-        print("No VMs to process.")
-        return True
 
-    # Prepare output file
-    results = []
-    header = f"{'HOST':<30} {'COUNT':<6} {'READ':<6} {'WRITE':<6} MOUNT_POINTS"
-    separator = f"{'----':<30} {'-----':<6} {'----':<6} {'-----':<6} ------------"
-    results.append(header)
-    results.append(separator)
-
-    print("\n" + "-" * 70)
-    print("Verifying NFS mounts on all VMs...")
-    print("-" * 70)
+def _verify_vm(vm_name, vm_ip):
+    """Test read/write access to every NFS mount of one VM. Returns (result_row, log_lines)."""
+    log = [f"\n[{vm_name}] ({vm_ip})"]
 
-    for vm in vms:
-        vm_name = vm["name"]
-        vm_ip = vm["public_ip"]
+    # Check SSH connectivity first; opening the shared connection is the handshake
+    # the test script needs anyway, so this costs no extra round-trip
+    if not is_ssh_reachable(vm_ip):
+        log.append(f"  Connection failed: could not open an SSH connection")
+        return _verify_row(vm_name, "ERROR", "-", "-", "connection failed"), log
 
-        print(f"\n[{vm_name}] ({vm_ip})")
-
-        # Check SSH connectivity first
-        _, err = run_remote_command(vm_ip, "echo ok", timeout=15)
-        if err:
-            print(f"  Connection failed: {err}")
-            results.append(f"{vm_name:<30} {'ERROR':<6} {'-':<6} {'-':<6} connection failed")
-            continue
-
-        # Get NFS mounts and test read/write on remote host
-        # We run a single SSH command that does all the testing to minimize connections
-        test_script = f'''
-mounts=$(findmnt -t nfs -n -o TARGET 2>/dev/null)
-if [ -z "$mounts" ]; then
-    echo "0|0|0|none"
-    exit 0
-fi
-
-count=0
-read_ok=0
-write_ok=0
-mount_status=""
+    # Get NFS mounts and test read/write on remote host
+    out, err = run_remote_command(vm_ip, VERIFY_SCRIPT, timeout=120)
 
-while IFS= read -r mount; do
-    [ -z "$mount" ] && continue
-    count=$((count + 1))
+    if err or not out:
+        log.append(f"  Error running verification: {err}")
+        return _verify_row(vm_name, "ERROR", "-", "-", "verification failed"), log
 
-    # Read test: try to list the directory (with timeout for hung NFS)
-    if timeout {NFS_TEST_TIMEOUT} ls "$mount" >/dev/null 2>&1; then
-        r="R"
-        read_ok=$((read_ok + 1))
-    else
-        r="-"
-    fi
+    # Parse result
+    parts = out.strip().split("|")
+    if len(parts) != 4:
+        log.append(f"  Unexpected output format: {out}")
+        return _verify_row(vm_name, "ERROR", "-", "-", "parse error"), log
 
-    # Write test: try to create and remove a temp file (with timeout for hung NFS)
-    testfile="$mount/.tmp_crusoe_nfs_verify_test_$$"
-    if timeout {NFS_TEST_TIMEOUT} touch "$testfile" 2>/dev/null && timeout {NFS_TEST_TIMEOUT} rm -f "$testfile" 2>/dev/null; then
-        w="W"
-        write_ok=$((write_ok + 1))
-    else
-        timeout {NFS_TEST_TIMEOUT} rm -f "$testfile" 2>/dev/null
-        w="-"
-    fi
+    count, read_ok, write_ok, mount_status = parts
 
-    mount_status="${{mount_status}}${{mount}}(${{r}}${{w}}),"
-done <<< "$mounts"
+    if count == "0":
+        log.append(f"  No NFS mounts found")
+    else:
+        log.append(f"  Found {count} NFS mount(s): {read_ok} readable, {write_ok} writable")
+        log.append(f"  Details: {mount_status}")
 
-mount_status=${{mount_status%,}}
-echo "${{count}}|${{read_ok}}|${{write_ok}}|${{mount_status}}"
-'''
+    return _verify_row(vm_name, count, read_ok, write_ok, mount_status), log
 
-        out, err = run_remote_command(vm_ip, test_script, timeout=120)
 
-        if err or not out:
-            print(f"  Error running verification: {err}")
-            results.append(f"{vm_name:<30} {'ERROR':<6} {'-':<6} {'-':<6} verification failed")
-            continue
+def do_verify_mounts(max_workers=MAX_PARALLEL_VMS):
+    """Verify NFS mounts on all VMs, testing read and write access, max_workers VMs at a time."""
+    # Load VMs from icat-vms.json
+    vms = load_vms()
+    if vms is None:
+        return False
 
-        # Parse result
-        parts = out.strip().split("|")
-        if len(parts) != 4:
-            print(f"  Unexpected output format: {out}")
-            results.append(f"{vm_name:<30} {'ERROR':<6} {'-':<6} {'-':<6} parse error")
-            continue
+    if len(vms) == 0:
+        print("No VMs to process.")
+        return True
 
-        count, read_ok, write_ok, mount_status = parts
+    header = _verify_row("HOST", "COUNT", "READ", "WRITE", "MOUNT_POINTS")
+    separator = _verify_row("----", "-----", "----", "-----", "------------")
 
-        if count == "0":
-            print(f"  No NFS mounts found")
-        else:
-            print(f"  Found {count} NFS mount(s): {read_ok} readable, {write_ok} writable")
-            print(f"  Details: {mount_status}")
+    # Open the output file up front, so an unwritable path fails before any VM is tested
+    with open(VERIFY_OUTPUT_FILE, "w") as f:
+        print(header, separator, sep="\n", file=f)
 
-        results.append(f"{vm_name:<30} {count:<6} {read_ok:<6} {write_ok:<6} {mount_status}")
+        print("\n" + "-" * 70)
+        print("Verifying NFS mounts on all VMs...")
+        print("-" * 70)
 
-    # Write results to file
-    with open(VERIFY_OUTPUT_FILE, "w") as f:
-        f.write("\n".join(results) + "\n")
+        # Rows come back in icat-vms.json order, whichever VM finishes first
+        rows = run_on_all_vms([(vm["name"], vm["public_ip"]) for vm in vms], _verify_vm, max_workers)
+        print(*rows.values(), sep="\n", file=f)
 
     print("\n" + "-" * 70)
     print(f"Results written to {VERIFY_OUTPUT_FILE}")
     print("-" * 70)
 
     # Also display the results
-    print("\n" + "\n".join(results))
+    print()
+    print(header, separator, *rows.values(), sep="\n")
 
     print(f"""
 Legend: R=read OK, W=write OK, -=failed or timed out
@@ -1070,6 +1699,17 @@ NFS_TEST_TIMEOUT: {NFS_TEST_TIMEOUT}s""")
 
 
 def main():
+    # Answer 'help' before importing and building the argument parser
+    if sys.argv[1:] == ["help"]:
+        print(__doc__)
+        sys.exit(0)
+
+    import argparse
+    import atexit
+
+    # Don't leave shared ssh connections lingering for ControlPersist after we're done
+    atexit.register(close_control_masters)
+
     parser = argparse.ArgumentParser(
         description=f"Migrate NFS mounts to {CRUSOE_NFS_DOMAIN}."
     )
@@ -1084,6 +1724,10 @@ def main():
         "-y", action="store_true",
         help="Auto-confirm without prompting"
     )
+    unmount_parser.add_argument(
+        "--only-unreachable", action="store_true",
+        help="Only process the VMs that were unreachable in an earlier run"
+    )
 
     # Remount subcommand
     remount_parser = subparsers.add_parser(
@@ -1094,6 +1738,10 @@ def main():
         "-y", action="store_true",
         help="Auto-confirm without prompting"
     )
+    remount_parser.add_argument(
+        "--mount-options", default="",
+        help="Additional NFS mount options to append (e.g. actimeo=600,nocto,lookupcache=pos)"
+    )
 
     # Fstab subcommand
     fstab_parser = subparsers.add_parser(
@@ -1104,6 +1752,10 @@ def main():
         "-y", action="store_true",
         help="Auto-confirm without prompting"
     )
+    fstab_parser.add_argument(
+        "--mount-options", default="",
+        help="Additional NFS mount options to append (e.g. actimeo=600,nocto,lookupcache=pos)"
+    )
 
     # Rollback subcommand
     rollback_parser = subparsers.add_parser(
@@ -1130,10 +1782,14 @@ def main():
     )
 
     # Verify-mounts subcommand
-    subparsers.add_parser(
+    verify_parser = subparsers.add_parser(
         "verify-mounts",
         help="Verify NFS mounts on all VMs, testing read and write access"
     )
+    verify_parser.add_argument(
+        "--parallel", type=int, default=MAX_PARALLEL_VMS, metavar="N",
+        help=f"Number of VMs to verify at once (default: {MAX_PARALLEL_VMS})"
+    )
 
     # Help subcommand
     subparsers.add_parser(
@@ -1151,17 +1807,17 @@ def main():
         print(__doc__)
         sys.exit(0)
     elif args.command == "unmount":
-        success = do_unmount(args.y)
+        success = do_unmount(args.y, args.only_unreachable)
     elif args.command == "remount":
-        success = do_remount(args.y)
+        success = do_remount(args.y, args.mount_options)
     elif args.command == "fstab":
-        success = update_fstab(args.y)
+        success = update_fstab(args.y, args.mount_options)
     elif args.command == "rollback":
         success = do_rollback(args.y)
     elif args.command == "list-vms":
         success = do_list_vms(args.project_id, args.y)
     elif args.command == "verify-mounts":
-        success = do_verify_mounts()
+        success = do_verify_mounts(max(1, args.parallel))
     else:
         parser.print_help()
         sys.exit(1)
@@ -1,7 +1,7 @@
 """
 This script will do the following:
 
-1) Validate that the NFS IPs are pingable.
+1) Validate that every NFS IP (start_ip through end_ip) is pingable.
 2) For every Virtiofs mount on the VM, unmount it and remount it as NFS.
 3) For every Virtiofs mount in /etc/fstab, replace it with the respective NFS mount.
 
@@ -11,81 +11,309 @@ If you have any questions, don't hesitate to reach out to Crusoe support.
 import argparse
 import subprocess
 import sys
-import json
 import uuid
 import time
+import os
+import select
+import atexit
+import threading
+import ipaddress
+import shlex
+import tempfile
+import ctypes
+import ctypes.util
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # START statics
 # these start and end IPs are used to connect to Crusoe's NFS servers
 start_ip = "100.64.0.2"
 end_ip = "100.64.0.17"
+# options for every NFS mount, both mounted now and in /etc/fstab
+nfs_mount_options = f"vers=3,nconnect=16,spread_reads,spread_writes,remoteports={start_ip}-{end_ip}"
+# mounts converted at once
+max_parallel_mounts = 16
+# seconds a single NFS mount attempt may take
+nfs_mount_timeout = 10
+# a failed NFS mount is retried after 0.1s, then twice as long each time, until this many seconds have passed
+mount_retry_deadline = 30
+# seconds to wait for every NFS IP to answer a ping (each ping waits 1s for its reply)
+ping_timeout = 3
 # END statics
 
-def run_command(command):
-    try:
-        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True, shell=True, timeout=5)
-        return result.stdout.strip(), result.stderr.strip()
-    except subprocess.TimeoutExpired as e:
-        return None, e
-    except subprocess.CalledProcessError as e:
-        return None, e
-    except Exception as e:
-        return None, e.stderr
-def is_valid_uuid(uuid_string):
+# when already running as root, unmounts and virtiofs remounts are done with the syscalls directly
+libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True) if os.geteuid() == 0 else None
+
+# every command runs through a long-lived root shell, instead of starting sudo and sh for each;
+# each thread gets its own, so mounts can be converted concurrently
+thread_shells = threading.local()
+root_shells = []
+
+def authenticate_sudo():
+    """
+    asks for the sudo password if needed, from the main thread only; root shells are started with
+    sudo -n, so worker threads never prompt (several prompts would race on the one terminal)
+    and a password prompt doesn't count against a command's timeout
+    """
     try:
-        uuid.UUID(str(uuid_string))
-        return True
-    except ValueError:
+        subprocess.run(["sudo", "-v"], check=True)
+    except (OSError, subprocess.CalledProcessError) as err:
+        print(f"Error: could not get root privileges through sudo: {err}")
         return False
+    return True
+def get_root_shell():
+    shell = getattr(thread_shells, "shell", None)
+    if shell is None or shell.poll() is not None:
+        shell = subprocess.Popen(["sudo", "-n", "sh"], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        thread_shells.shell = shell
+        root_shells.append(shell)
+    return shell
+def stop_root_shell(shell, interrupt=False):
+    """
+    lets a root shell exit at the end of its input, or with interrupt, stops it mid-command
+    """
+    try:
+        if interrupt:
+            # sudo passes SIGTERM on to the shell
+            shell.terminate()
+        shell.stdin.close()
+        shell.wait(timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+        shell.kill()
+        shell.wait()
+def close_root_shell(interrupt=False):
+    shell = getattr(thread_shells, "shell", None)
+    if shell is not None:
+        thread_shells.shell = None
+        stop_root_shell(shell, interrupt)
+def close_all_root_shells():
+    for shell in root_shells:
+        if shell.poll() is None:
+            stop_root_shell(shell)
+    root_shells.clear()
+def read_until_marker(shell, marker, command, timeout):
+    """
+    reads the shell's stdout and stderr until both end with the command's marker line;
+    returns (stdout, stderr, return code)
+    """
+    out_fd, err_fd = shell.stdout.fileno(), shell.stderr.fileno()
+    buffers = {out_fd: b"", err_fd: b""}
+    out_marker, err_marker = f"\n{marker} ".encode(), f"\n{marker}\n".encode()
+    pending = {out_fd, err_fd}
+    deadline = time.monotonic() + timeout
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise subprocess.TimeoutExpired(command, timeout)
+        ready, _, _ = select.select(list(pending), [], [], remaining)
+        for fd in ready:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise OSError("the root shell exited unexpectedly")
+            buffers[fd] += chunk
+        out = buffers[out_fd]
+        if out_fd in pending and out.endswith(b"\n") and out.rfind(out_marker) != -1:
+            pending.discard(out_fd)
+        if err_fd in pending and buffers[err_fd].endswith(err_marker):
+            pending.discard(err_fd)
+
+    out, _, rc = buffers[out_fd].rpartition(out_marker)
+    err = buffers[err_fd][:-len(err_marker)]
+    return out.decode(), err.decode(), int(rc)
+def run_command(command, timeout=5):
+    """
+    runs an argv list, or a string of shell script, in the root shell; returns (stdout, stderr, return code).
+    if the command couldn't be run or timed out, the return code is None and the error is returned in place of stderr
+    """
+    if not isinstance(command, str):
+        # quoted so no argument is ever interpreted by the shell
+        command = shlex.join(command)
+    # each command gets its own marker; its stdin is /dev/null so it can't read the shell's input
+    marker = uuid.uuid4().hex
+    script = f"{{ {command}\n}} </dev/null\nprintf '\\n{marker} %d\\n' $?\nprintf '\\n{marker}\\n' >&2\n"
+    try:
+        shell = get_root_shell()
+        shell.stdin.write(script.encode())
+        shell.stdin.flush()
+        out, err, rc = read_until_marker(shell, marker, command, timeout)
+    except subprocess.TimeoutExpired as e:
+        # the shell is still busy with the command; start a fresh one next time
+        close_root_shell(interrupt=True)
+        return None, e, None
+    except OSError as e:
+        close_root_shell(interrupt=True)
+        return None, e, None
+    return out.strip(), err.strip(), rc
+def syscall_result(ret, path):
+    """
+    turns a libc return value into run_command's (out, err, return code)
+    """
+    if ret != 0:
+        errno = ctypes.get_errno()
+        return "", OSError(errno, os.strerror(errno), path), errno
+    return "", "", 0
+def unmount(mount_dir):
+    if libc is None:
+        return run_command(["umount", mount_dir])
+    return syscall_result(libc.umount2(mount_dir.encode(), 0), mount_dir)
+def mount_virtiofs(disk_name, mount_dir):
+    if libc is None:
+        return run_command(["mount", "-t", "virtiofs", disk_name, mount_dir])
+    return syscall_result(libc.mount(disk_name.encode(), mount_dir.encode(), b"virtiofs", 0, None), mount_dir)
+# one DISK_NAME,DISK_ID pair of --name-ids, with the disk ID in the canonical 8-4-4-4-12 hex form,
+# followed by a + unless it's the last pair
+name_id_re = re.compile(
+    r"([^,+]+),([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})(?:\+|\Z)", re.IGNORECASE
+)
+
 def get_name_to_id_mapping(name_ids):
-    name_ids_pairs = name_ids.split('+')
+    # split and validated in a single regex pass: the pairs must follow each other to the end
     name_to_id = {}
-    for name_id_pair in name_ids_pairs:
-        if "," not in name_id_pair:
-            return None, f"missing comma for {name_id_pair}; see -h for more details"
-        name_and_id = name_id_pair.split(",")
-        name = name_and_id[0]
-        uuid = name_and_id[1]
-        if not is_valid_uuid(uuid):
-            return None, f"invalid disk UUID for name {name}: '{uuid}'"
-        name_to_id[name] = uuid
-
-    return name_to_id, ""
+    pos = 0
+    for match in name_id_re.finditer(name_ids):
+        if match.start() != pos:
+            break
+        name_to_id[match.group(1)] = match.group(2)
+        pos = match.end()
+    # a trailing + leaves an empty last pair
+    if name_to_id and pos == len(name_ids) and not name_ids.endswith("+"):
+        return name_to_id, ""
+
+    # the first pair that didn't match is what's wrong
+    pair = name_ids[pos:].split("+", 1)[0]
+    return None, f"invalid DISK_NAME,DISK_ID pair '{pair}'; see -h for more details"
+def unescape_mountinfo(value):
+    # mountinfo (and fstab) escape space, tab, newline and backslash as \NNN (octal)
+    return re.sub(rb"\\([0-7]{3})", lambda m: bytes([int(m.group(1), 8)]), value.encode()).decode()
 def get_current_mounts():
-    out, err = run_command("findmnt -t virtiofs --json")
-    if err:
-        print(f"something went wrong: {out} {err}")
+    # the kernel's own mount table, read directly rather than through findmnt
+    try:
+        with open("/proc/self/mountinfo") as f:
+            lines = f.read().splitlines()
+    except OSError as err:
+        print(f"something went wrong: {err}")
         return
-    mounts_json = json.loads(out)
 
     mounts = []
-    for target in mounts_json["filesystems"]:
-        mounts.append((target["target"], target["source"]))
+    for line in lines:
+        # "<id> <parent> <dev> <root> <mount point> <options> [optional fields...] - <fs type> <source> <super options>"
+        fields, _, fs_fields = line.partition(" - ")
+        fs_fields = fs_fields.split(" ")
+        if fs_fields[0] == "virtiofs":
+            mounts.append((unescape_mountinfo(fields.split(" ")[4]), unescape_mountinfo(fs_fields[1])))
 
     return mounts
+def volume_path(volume_id):
+    return f"/volumes/{volume_id}"
+def nfs_source(volume_id):
+    return f"{start_ip}:{volume_path(volume_id)}"
+def get_nfs_exports(server_ip):
+    """
+    returns (set of the server's export paths, error)
+    """
+    out, err, rc = run_command(["showmount", "-e", server_ip])
+    if rc != 0:
+        return None, err
+    # the first line is the "Export list for ..." header; each line after starts with an export path
+    return {line.split()[0] for line in out.splitlines()[1:] if line.strip()}, None
 def verify_all_mounts_exist(mounts, name_to_id):
-    out, err = run_command(f"showmount -e {start_ip}")
-    if err:
-        print(f"Error: could not find any mounts for this VM: {err}")
-        return False
+    """
+    checks, before anything is unmounted, that every disk has a volume ID which the NFS server exports;
+    prints every problem found, not just the first. if the exports can't be listed, only the volume IDs are checked
+    """
+    ok = True
     for _, disk_name in mounts:
         if disk_name not in name_to_id:
-            return False
+            print(f"Error: cannot find volume ID for {disk_name}")
+            ok = False
+    if not ok:
+        return False
+
+    # showmount needs mountd to answer, which the NFS mount itself may not; a missing export is then
+    # caught by the mount failing, which remounts virtiofs
+    exports, err = get_nfs_exports(start_ip)
+    if err:
+        print(f"WARNING: could not list the volumes exported by the NFS server, continuing without checking them: {err}")
+        return True
+    for _, disk_name in mounts:
         volume_id = name_to_id[disk_name]
-        if f"/volumes/{volume_id}" not in out:
-            return False
-    return True
+        if volume_path(volume_id) not in exports:
+            print(f"Error: volume {volume_id} for {disk_name} is not exported by the NFS server")
+            ok = False
+    return ok
+def ping_all(ips):
+    """
+    pings every IP at once in a single command; returns (unreachable IPs, error)
+    """
+    ip_args = " ".join(ips)
+    # fping probes them all itself and lists the ones that didn't answer (exit status 1 means some didn't);
+    # otherwise run one ping per IP in the background
+    out, err, rc = run_command(
+        f"if command -v fping >/dev/null 2>&1; then fping -u -r 0 -t 1000 {ip_args} 2>/dev/null; [ $? -le 1 ]; "
+        f"else for ip in {ip_args}; do (ping -c 1 -W 1 $ip >/dev/null 2>&1 || echo $ip) & done; wait; fi",
+        timeout=ping_timeout
+    )
+    if rc != 0:
+        return None, err or f"exit status {rc}"
+    return out.split(), None
+def nfs_server_ips():
+    """
+    every IP from start_ip to end_ip; NFS mounts spread their connections across all of them (remoteports)
+    """
+    first, last = int(ipaddress.IPv4Address(start_ip)), int(ipaddress.IPv4Address(end_ip))
+    return [str(ipaddress.IPv4Address(ip)) for ip in range(first, last + 1)]
 def verify_ping():
-    _, err = run_command(f"ping -c 1 {start_ip}")
+    unreachable, err = ping_all(nfs_server_ips())
     if err:
+        print(f"Error: could not ping the NFS server: {err}")
         return False
-    _, err = run_command(f"ping -c 1 {end_ip}")
-    if err:
+    if unreachable:
+        print(f"Error: no reply from {', '.join(unreachable)}")
         return False
     return True
-def remount_virtiofs_mounts(name_to_id, auto_confirm):
-    mounts = get_current_mounts()
+def convert_mount(mount_dir, disk_name, name_to_id):
+    """
+    unmounts one virtiofs mount and mounts its volume over NFS, remounting virtiofs if that fails;
+    returns (success, log_lines)
+    """
+    log_lines = []
+    def log_err_and_remount(out, err):
+        out_format = f"{out} " if out else ""
+        err_format = err if err else ""
+        log_lines.append(f"\tunmount failed, is it currently in use? details: {out_format}{err_format}")
+        # attempt to remount
+        _, err, rc = mount_virtiofs(disk_name, mount_dir)
+        if rc != 0:
+            log_lines.append(f"attempt to remount failed: {err}")
+
+    log_lines.append(f"attempting to remount {mount_dir} from virtiofs to NFS...")
+    # looked up before unmounting, so a missing volume ID can't leave the disk unmounted
+    source = nfs_source(name_to_id[disk_name])
+    out, err, rc = unmount(mount_dir)
+    if rc != 0:
+        log_err_and_remount(out, err)
+        time.sleep(0.2)
+        return False, log_lines
 
+    # attempt up to 5 times, backing off between attempts
+    num_retries = 5
+    delay = 0.1
+    deadline = time.monotonic() + mount_retry_deadline
+    for i in range(num_retries):
+        # always through mount.nfs: it resolves the server address and negotiates with mountd,
+        # which a bare mount(2) call would leave to us
+        out, err, rc = run_command(["mount", "-o", nfs_mount_options, source, mount_dir], timeout=nfs_mount_timeout)
+        # only the exit status counts; warnings on stderr don't make it a failure
+        if rc == 0:
+            log_lines.append(f"\tremount succeeded.")
+            return True, log_lines
+        # retrying won't help if something is already mounted there, or time is up
+        if i == num_retries - 1 or "already mounted" in str(err) or time.monotonic() + delay >= deadline:
+            log_err_and_remount(out, err)
+            return False, log_lines
+        time.sleep(delay)
+        delay *= 2
+def remount_virtiofs_mounts(mounts, name_to_id, auto_confirm):
     print("Verifying NFS server can be reached...")
     if not verify_ping():
         print(f"Error: could not reach NFS server")
@@ -95,6 +323,10 @@ def remount_virtiofs_mounts(name_to_id, auto_confirm):
         print("There are no virtiofs mounts that need to be remounted to NFS.")
         return True
 
+    # every disk needs a volume ID that the NFS server exports before anything is unmounted
+    if not verify_all_mounts_exist(mounts, name_to_id):
+        return
+
     print(" ----------------------------------------------------------------------------------------------- ")
     for mount_dir, disk_name in mounts:
         print(f"\t{disk_name} on {mount_dir} is currently VIRTIOFS")
@@ -105,70 +337,69 @@ def remount_virtiofs_mounts(name_to_id, auto_confirm):
             print("User did not specify (y), so the operation was canceled")
             return
 
-    failed_count = 0
-    for mount_dir, disk_name in mounts:
-        def print_err_and_remount(out, err):
-            out_format = f"{out} " if out else ""
-            err_format = err if err else ""
-            print(f"\tunmount failed, is it currently in use? details: {out_format}{err_format}")
-            # attempt to remount
-            out, err = run_command(f"sudo mount -t virtiofs '{disk_name}' '{mount_dir}'")
-            if err:
-                print(f"attempt to remount failed: {err}")
-
-        print(f"attempting to remount {mount_dir} from virtiofs to NFS...")
-        # attempt up to 5 times
-        out, err = run_command(f"sudo umount '{mount_dir}'")
-        if err:
-            print_err_and_remount(out, err)
-            time.sleep(0.2)
-            failed_count += 1
-        else:
-            num_retries = 5
-            for i in range(num_retries):
-                successful_mount_message = "mount was successful!"
-                out, err = run_command(f"sudo mount -o vers=3,nconnect=16,spread_reads,spread_writes,remoteports={start_ip}-{end_ip} {start_ip}:/volumes/{name_to_id[disk_name]} '{mount_dir}' && echo '{successful_mount_message}'")
-                if err and (not out or successful_mount_message not in out):
-                    if i == num_retries - 1:
-                        print_err_and_remount(out, err)
-                        failed_count += 1
-                else:
-                    print(f"\tremount succeeded.")
-                    break
-    
+    # the prompt may have outlasted sudo's cached credentials; refresh them before the workers need them
+    if not authenticate_sudo():
+        return
+
+    # each mount is independent, so they're converted concurrently; each one's output is printed as a block
+    results = []
+    with ThreadPoolExecutor(max_workers=min(len(mounts), max_parallel_mounts)) as executor:
+        futures = {executor.submit(convert_mount, mount_dir, disk_name, name_to_id): mount_dir for mount_dir, disk_name in mounts}
+        for future in as_completed(futures):
+            try:
+                success, log_lines = future.result()
+            except Exception as err:
+                # one mount's unexpected error doesn't stop the others being reported
+                success, log_lines = False, [f"attempting to remount {futures[future]} from virtiofs to NFS...", f"\tunexpected error: {err}"]
+            # one write per mount, rather than one per line
+            sys.stdout.write("\n".join(log_lines) + "\n")
+            sys.stdout.flush()
+            results.append(success)
+    failed_count = results.count(False)
+
     print(f"RESULT: {len(mounts) - failed_count} mount(s) succeeded.")
     if failed_count > 0:
         print(f"Error: {failed_count} mount(s) failed. Please re-run this script after resolving the issues.")
     return failed_count == 0
     
+def rewrite_fstab_line(line, name_to_id):
+    """
+    returns (the line to write in its place, whether it's a virtiofs entry)
+    """
+    fields = line.split()
+    # blank lines and comments are kept as they are
+    if not fields or fields[0].startswith("#"):
+        return line, False
+    if len(fields) < 6:
+        print(f"WARNING: could not parse fstab line {line}")
+        return line, False
+    # fields are split on whitespace, with spaces inside a field written as \040; the mount
+    # point is copied into the new line still escaped, the disk name is looked up unescaped
+    disk_name, mount_dir, fs_type = fields[:3]
+    if fs_type != "virtiofs":
+        return line, False
+    disk_name = unescape_mountinfo(disk_name)
+    if disk_name not in name_to_id:
+        print(f"Error: cannot find volume ID for {disk_name}")
+        return line, True
+
+    return f"{nfs_source(name_to_id[disk_name])} {mount_dir} nfs {nfs_mount_options},_netdev,nofail,x-systemd.automount,x-systemd.idle-timeout=30 0 0", True
 def remount_fstab_mounts(name_to_id, auto_confirm):
-    out, err = run_command("sudo cat /etc/fstab")
-    if err:
+    # /etc/fstab is world-readable, so no need to go through the root shell
+    try:
+        with open("/etc/fstab") as f:
+            out = f.read().strip()
+    except OSError as err:
         print(f"Checking fstab file contents failed: {err}")
         return
     
     out_lines = out.split("\n")
-    if len(out_lines) < 2:
-        print("There are no fstab mounts to convert from virtiofs to NFS.")
-        return
-
-    new_lines = out_lines[:]
+    new_lines = []
     virtiofs_mount_count = 0
-    for i in range(1, len(out_lines)):
-        old_line = out_lines[i]
-        mount_options = old_line.split()
-        mount_dir = mount_options[1]
-        disk_name = mount_options[0]
-        if len(mount_options) < 6:
-            print(f"WARNING: could not parse fstab line {old_line}")
-            continue
-        if mount_options[2] == "virtiofs":
-            virtiofs_mount_count += 1
-            if disk_name not in name_to_id:
-                print(f"Error: cannot find volume ID for {disk_name}")
-                continue
-
-            new_lines[i] = f"{start_ip}:/volumes/{name_to_id[disk_name]} {mount_dir} nfs vers=3,nconnect=16,spread_reads,spread_writes,remoteports={start_ip}-{end_ip},_netdev,nofail,x-systemd.automount,x-systemd.idle-timeout=30 0 0"    
+    for line in out_lines:
+        new_line, is_virtiofs = rewrite_fstab_line(line, name_to_id)
+        new_lines.append(new_line)
+        virtiofs_mount_count += is_virtiofs
     if virtiofs_mount_count == 0:
         print("There are no fstab mounts to convert from virtiofs to NFS.")
         return
@@ -189,10 +420,21 @@ def remount_fstab_mounts(name_to_id, auto_confirm):
         if key_press.lower() != "y":
             print("User did not specify (y), so the operation was canceled")
             return
+    if not authenticate_sudo():
+        return
 
-    lines_combined = "\n".join(new_lines)
-    out, err = run_command(f"echo '{lines_combined}' | sudo sh -c 'cat > /etc/fstab'")
-    if err:
+    # written by us, then installed as root; any character in the file is safe this way.
+    # the new file is synced and renamed over /etc/fstab, so a crash leaves either the old or new file, never a partial one
+    with tempfile.NamedTemporaryFile("w", delete=False) as f:
+        f.write("\n".join(new_lines) + "\n")
+    try:
+        _, err, rc = run_command(
+            f"install -m 644 {shlex.quote(f.name)} /etc/fstab.new && sync /etc/fstab.new && mv -f /etc/fstab.new /etc/fstab && sync /etc"
+            " || { rm -f /etc/fstab.new; false; }"
+        )
+    finally:
+        os.unlink(f.name)
+    if rc != 0:
         print(f"Error: error when replacing fstab file: {err}")
         return
     else:
@@ -220,8 +462,14 @@ def do_main():
         print(f"Error: parsing input failed: {err}", file=sys.stderr)
         return
 
+    atexit.register(close_all_root_shells)
+    if not authenticate_sudo():
+        return
     auto_confirm = args.y
-    succeeded = remount_virtiofs_mounts(name_to_id, auto_confirm)
+    mounts = get_current_mounts()
+    if mounts is None:
+        return
+    succeeded = remount_virtiofs_mounts(mounts, name_to_id, auto_confirm)
     if succeeded:
         remount_fstab_mounts(name_to_id, auto_confirm)
 if __name__ == "__main__":
@@ -13,39 +13,76 @@ import subprocess
 import argparse
 import sys
 import platform
+import tempfile
+import os
 
 NFS_PACKAGE_URL = "https://github.com/crusoecloud/crusoe-nfs-support/raw/refs/heads/main/debs/vastnfs-dkms_4.0.35-vastdata_all.deb"
 NFS_PACKAGE_URL_KERNEL_68_PLUS = "https://github.com/crusoecloud/crusoe-nfs-support/raw/refs/heads/main/debs/vastnfs-dkms_4.5.1-vastdata_all.deb"
 
+# read once; the kernel can't change while the script runs
+KERNEL_RELEASE = platform.release()
+try:
+    KERNEL_VERSION = tuple(map(int, KERNEL_RELEASE.split('-')[0].split('+')[0].split('.')))
+except ValueError:
+    KERNEL_VERSION = None
+
+# applied on every boot by the network-config-nfs systemd service
+NETWORK_CONFIG_SCRIPT = """#!/bin/bash
+ip -o link show | awk -F': ' '/ens/{print $2}' | xargs -r -I{} sudo ip link set dev {} mtu 9000
+ip -o link show | awk -F': ' '/ens/{print $2}' | xargs -r -I{} bash -c 'sudo ethtool -G {} tx 8192 && sudo ethtool -G {} rx 8192'
+"""
+NETWORK_CONFIG_SERVICE = """[Unit]
+Description=Network Configuration for NFS
+After=network-online.target
+
+[Service]
+Type=oneshot
+ExecStart=/usr/local/bin/network-config-nfs.sh
+
+[Install]
+WantedBy=multi-user.target
+"""
+
 def run_command(command, timeout=5):
+    """
+    runs an argv list directly, or a string through the shell (for pipelines and redirects)
+    """
     try:
-        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True, shell=True, timeout=timeout)
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True, shell=isinstance(command, str), timeout=timeout)
         # return error only if error code is non-zero
         return result.stdout.strip(), result.stderr.strip() if result.returncode != 0 else None
     except subprocess.TimeoutExpired as e:
         return None, e
     except subprocess.CalledProcessError as e:
         return None, e
+    except OSError as e:
+        # e.g. the program isn't installed
+        return None, e
     except Exception as e:
         return None, e.stderr
+def install_file(content, dest, mode):
+    """
+    writes content to a temporary file and installs it as root at dest with the given mode
+    """
+    with tempfile.NamedTemporaryFile("w", delete=False) as f:
+        f.write(content)
+    try:
+        return run_command(["sudo", "install", "-m", mode, f.name, dest])
+    finally:
+        os.unlink(f.name)
 def is_kernel_at_least(target_version):
     """
     returns True if current kernel is >= target_version
     """
-    raw_version = platform.release()    
-    cleaned_version = raw_version.split('-')[0].split('+')[0]
-    
-    def parse(v):
-        return tuple(map(int, v.split('.')))
+    if KERNEL_VERSION is None:
+        return False, f"could not parse kernel version {KERNEL_RELEASE}"
 
     try:
-        current_tuple = parse(cleaned_version)
-        target_tuple = parse(target_version)
-        
-        return current_tuple >= target_tuple, None
-        
+        target_tuple = tuple(map(int, target_version.split('.')))
     except ValueError:
-        return False, f"could not parse kernel version {raw_version}"
+        return False, f"could not parse target kernel version {target_version}"
+
+    return KERNEL_VERSION >= target_tuple, None
 def manually_install_VAST_NFS_driver(auto_confirm = False):
     if not auto_confirm:
         key_press = input(f"IMPORTANT: The NFS driver will be installed. \n\tThis requires installing a few packages (dkms nfs-common).\n\tContinue? (y/N) ")
@@ -57,7 +94,7 @@ def manually_install_VAST_NFS_driver(auto_confirm = False):
     kernel_68, err = is_kernel_at_least("6.8")
     if err:
         print(f"WARNING: something went wrong when checking the kernel version (falling back to default package; please report this to support): {err}")
-    _, err = run_command(f"cd /tmp && wget -O /tmp/crusoe_nfs.deb {NFS_PACKAGE_URL_KERNEL_68_PLUS if kernel_68 else NFS_PACKAGE_URL}", 300)
+    _, err = run_command(["wget", "-O", "/tmp/crusoe_nfs.deb", NFS_PACKAGE_URL_KERNEL_68_PLUS if kernel_68 else NFS_PACKAGE_URL], 300)
     if err:
         print(f"ERROR: something went wrong when downloading the driver: {err}")
         return err
@@ -69,18 +106,20 @@ def manually_install_VAST_NFS_driver(auto_confirm = False):
         return err
 
     print("Installing the NFS driver (this may take a while)...")
-    _, err = run_command(f"sudo dpkg -i /tmp/crusoe_nfs.deb", 600)
+    _, err = run_command(["sudo", "dpkg", "-i", "/tmp/crusoe_nfs.deb"], 600)
     if err:
         print(f"ERROR: something went wrong when manually installing the driver: {err}")
         return err
     
     print("The NFS driver has been installed!")
 def check_if_VAST_NFS_driver_installed():
-    out, err = run_command("dpkg -l | grep vastnfs")
+    # only query the vastnfs packages, rather than listing every installed package
+    out, err = run_command(["dpkg-query", "-W", "-f=${Package} ${Status}\n", "vastnfs*"])
     if err:
         return False, err
-    if out and "vastnfs-modules" in out:
-        return True, None
+    for line in (out or "").splitlines():
+        if line.startswith("vastnfs-modules ") and line.endswith("install ok installed"):
+            return True, None
     return False, None
 def install_VAST_NFS_driver(auto_confirm = False):
     installed, err = check_if_VAST_NFS_driver_installed()
@@ -94,9 +133,7 @@ def install_VAST_NFS_driver(auto_confirm = False):
     Reload the driver
     Success
     """
-    kernel_version, err = run_command("uname -r")
-    if err:
-        print(f"ERROR: could not find kernel version: {err}")
+    kernel_version = KERNEL_RELEASE
     print(f"Your VM's kernel version is: {kernel_version}")
 
     if kernel_version:
@@ -106,7 +143,7 @@ def install_VAST_NFS_driver(auto_confirm = False):
             return
 
     print("Enabling NFS drivers...")
-    _, err = run_command("sudo update-initramfs -u -k `uname -r` && sudo vastnfs-ctl reload", 300)
+    _, err = run_command(f"sudo update-initramfs -u -k {KERNEL_RELEASE} && sudo vastnfs-ctl reload", 300)
     if err:
         print(f"ERROR: could not reload NFS drivers, please report this to the Crusoe team: {err}")
     
@@ -119,7 +156,7 @@ def update_read_ahead_cache(auto_confirm = False):
 
     add the udev rule to auto-apply the read-ahead cache
     """
-    out, err = run_command("ls /etc/udev/rules.d/99-nfs.rules")
+    out, err = run_command(["ls", "/etc/udev/rules.d/99-nfs.rules"])
     if out and "/etc/udev/rules.d/99-nfs.rules" in out:
         print("udev rule to apply read-ahead cache already exists, skipping")
         return
@@ -130,22 +167,24 @@ def update_read_ahead_cache(auto_confirm = False):
             print("User did not specify (y), so the operation was canceled")
             return
     
-    _, err = run_command(r"""echo 'SUBSYSTEM=="bdi", ACTION=="add", PROGRAM="/bin/awk -v bdi=$kernel '\''BEGIN{ret=1} {if ($$4 == bdi) {ret=0}} END{exit ret}'\'' /proc/fs/nfsfs/volumes", ATTR{read_ahead_kb}="16384"' | sudo sh -c 'cat > /etc/udev/rules.d/95-nfs-readahead.rules'""")
-    if err:
-        print(f"ERROR: failure creating udev rule: {err}")
-        return
-    
-    _, err = run_command("sudo udevadm control --reload-rules && sudo udevadm trigger --verbose --action add --subsystem-match nvme && sudo udevadm trigger --verbose --action add")
-    if err:
-        print(f"ERROR: could not reload udev rules: {err}")
-        return
-    
-    _, err = run_command("""echo '[nfsrahead]
-    nfs=16384
-    nfs4=16384
-    default=128' | sudo sh -c 'cat >> /etc/nfs.conf'""")
+    # one root shell writes the udev rule, reloads udev and updates nfs.conf, stopping at the first failure
+    script = r"""set -e
+cat > /etc/udev/rules.d/95-nfs-readahead.rules <<'EOF'
+SUBSYSTEM=="bdi", ACTION=="add", PROGRAM="/bin/awk -v bdi=$kernel 'BEGIN{ret=1} {if ($$4 == bdi) {ret=0}} END{exit ret}' /proc/fs/nfsfs/volumes", ATTR{read_ahead_kb}="16384"
+EOF
+udevadm control --reload-rules
+udevadm trigger --verbose --action add --subsystem-match nvme
+udevadm trigger --verbose --action add
+cat >> /etc/nfs.conf <<'EOF'
+[nfsrahead]
+nfs=16384
+nfs4=16384
+default=128
+EOF
+"""
+    _, err = run_command(["sudo", "sh", "-c", script], 60)
     if err:
-        print(f"ERROR: could not reload udev rules: {err}")
+        print(f"ERROR: could not apply readahead cache settings: {err}")
         return
     
     print("Updated readahead cache settings successfully.")
@@ -165,48 +204,19 @@ def optimize_network_interface(auto_confirm = False):
             print("User did not specify (y), so the operation was canceled")
             return
 
-    _, err = run_command(
-        r"""
-        sudo sh -c "echo \"#!/bin/bash\" > /usr/local/bin/network-config-nfs.sh"
-        """
-    )
+    _, err = install_file(NETWORK_CONFIG_SCRIPT, "/usr/local/bin/network-config-nfs.sh", "755")
     if err:
-        print(f"ERROR: could not apply MTU for network-config-nfs.sh: {err}")
+        print(f"ERROR: could not create network-config-nfs.sh: {err}")
         return
 
-    _, err = run_command(
-        r"""
-        sudo sh -c "echo \"ip -o link show | awk -F': ' '/ens/{print $\"2\"}' | xargs -r -I{} sudo ip link set dev {} mtu 9000\" >> /usr/local/bin/network-config-nfs.sh"
-        """
-    )
-    if err:
-        print(f"ERROR: could not apply MTU for network-config-nfs.sh: {err}")
-        return
-
-    _, err = run_command(
-        r"""
-        sudo sh -c "echo \"ip -o link show | awk -F': ' '/ens/{print $\"2\"}' | xargs -r -I{} bash -c 'sudo ethtool -G {} tx 8192 && sudo ethtool -G {} rx 8192'\" >> /usr/local/bin/network-config-nfs.sh"
-        """
-    )
-    if err:
-        print(f"ERROR: could not apply ring buffer for network-config-nfs.sh: {err}")
-        return
-
-    _, err = run_command("sudo chmod +x /usr/local/bin/network-config-nfs.sh")
-    if err:
-        print(f"ERROR: could not apply chmod for network-config-nfs.sh: {err}")
-        return
-    
-    _, err = run_command(
-        r"""
-        sudo sh -c 'echo "[Unit]\nDescription=Network Configuration for NFS\nAfter=network-online.target\n\n[Service]\nType=oneshot\nExecStart=/usr/local/bin/network-config-nfs.sh\n\n[Install]\nWantedBy=multi-user.target" > /etc/systemd/system/network-config-nfs.service'
-        """
-    )
+    _, err = install_file(NETWORK_CONFIG_SERVICE, "/etc/systemd/system/network-config-nfs.service", "644")
     if err:
         print(f"ERROR: could not apply systemd for network-config-nfs.sh: {err}")
         return
     
-    _, err = run_command("sudo systemctl daemon-reload && sudo systemctl enable network-config-nfs.service && sudo systemctl start network-config-nfs.service")
+    _, err = run_command(["sudo", "systemctl", "daemon-reload"])
+    if not err:
+        _, err = run_command(["sudo", "systemctl", "enable", "--now", "network-config-nfs.service"])
     if err:
         print(f"ERROR: could not apply systemd for network-config-nfs.sh: {err}")
         return